@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        from . import cache  # noqa: F401
+        from .metrics import outbox_gauges, registry
+        registry.register_collector(outbox_gauges)
@@ -0,0 +1,38 @@
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users.models import TOKEN_CLAIMS, TokenUser, get_token_version
+
+
+class ClaimsRefreshToken(RefreshToken):
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in TOKEN_CLAIMS:
+            token[claim] = getattr(user, claim)
+        token['token_version'] = user.token_version
+        return token
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if 'token_version' not in validated_token:
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                'Токен не содержит идентификатора пользователя'
+            )
+        if (
+            not validated_token['is_active']
+            or get_token_version(user_id) != validated_token['token_version']
+        ):
+            raise AuthenticationFailed(
+                'Токен устарел, получите новый',
+                code='token_outdated'
+            )
+        return TokenUser.from_token(validated_token, user_id)
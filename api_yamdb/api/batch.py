@@ -0,0 +1,85 @@
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from .compiled import get_compiled
+
+
+class BatchRetrieveMixin:
+    """Несколько объектов одним запросом: `?ids=1,2,3` в списке.
+
+    Значения — поле `lookup_field` представления. Объекты читаются одним
+    запросом со связанными данными и отдаются в порядке запроса без
+    пагинации; не найденные значения перечисляются в `missing`.
+    """
+    batch_query_param = 'ids'
+
+    def list(self, request, *args, **kwargs):
+        if self.batch_query_param not in request.query_params:
+            return super().list(request, *args, **kwargs)
+        values = self.get_batch_values(
+            request.query_params[self.batch_query_param]
+        )
+        found = self.fetch_batch(
+            self.filter_queryset(self.get_queryset()), values
+        )
+        return Response(OrderedDict([
+            ('results', [found[value] for value in values if value in found]),
+            ('missing', [value for value in values if value not in found]),
+        ]))
+
+    def get_batch_field(self):
+        model = self.get_queryset().model
+        if self.lookup_field == 'pk':
+            return model._meta.pk
+        return model._meta.get_field(self.lookup_field)
+
+    def get_batch_values(self, raw):
+        field = self.get_batch_field()
+        values = []
+        for item in raw.split(','):
+            item = item.strip()
+            if not item:
+                continue
+            try:
+                value = field.to_python(item)
+            except ValidationError:
+                raise serializers.ValidationError({
+                    self.batch_query_param: [
+                        f'Некорректное значение {item!r}.'
+                    ]
+                })
+            if value not in values:
+                values.append(value)
+        limit = getattr(self, 'max_page_size', None) or (
+            settings.API_MAX_PAGE_SIZE
+        )
+        if len(values) > limit:
+            raise serializers.ValidationError({
+                self.batch_query_param: [
+                    f'Не больше {limit} объектов за запрос'
+                ]
+            })
+        return values
+
+    def fetch_batch(self, queryset, values):
+        """Представления найденных объектов по значению поля."""
+        name = self.get_batch_field().attname
+        queryset = queryset.filter(**{f'{name}__in': values})
+        compiled = get_compiled(self.get_serializer())
+        if compiled is not None:
+            rows = list(compiled.values(queryset, name))
+            return {
+                row[name]: data
+                for row, data in zip(rows, compiled.to_representation(rows))
+            }
+        objects = list(queryset)
+        return {
+            getattr(obj, name): data
+            for obj, data in zip(
+                objects, self.get_serializer(objects, many=True).data
+            )
+        }
@@ -0,0 +1,369 @@
+import time
+import tracemalloc
+import uuid
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import ADMIN, User
+from .cache import CATALOG, invalidate
+from .compiled import get_compiled
+from .renderers import JSON_BACKENDS, FastJSONRenderer
+from .serializers import (CommentSerializer, ReviewSerializer,
+                          TitleSerializerRead)
+from .urls import router
+from .views import TitleViewSet
+
+BATCH_SIZE = 1000
+SERIALIZER_PAGE_SIZES = (5, 50, 200, 1000)
+RENDERER_PAGE_SIZES = (100, 1000)
+
+DEFAULT_SIZES = {
+    'users': 100,
+    'categories': 10,
+    'genres': 20,
+    'titles': 1000,
+    'reviews_per_title': 10,
+    'comments_per_review': 2,
+}
+
+
+def batched_create(model, objects):
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) >= BATCH_SIZE:
+            model.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+
+
+def seed(sizes):
+    sizes = {**DEFAULT_SIZES, **sizes}
+    if sizes['reviews_per_title'] > sizes['users']:
+        raise ValueError(
+            'reviews_per_title не может быть больше users: '
+            'один пользователь оставляет один отзыв на произведение'
+        )
+    batched_create(User, (
+        User(
+            username=f'bench_user_{number}',
+            email=f'bench_user_{number}@yamdb.fake',
+            confirmation_code=str(uuid.uuid3(
+                uuid.NAMESPACE_X500, f'bench_user_{number}@yamdb.fake'
+            )),
+            role=ADMIN if number == 0 else 'user',
+        )
+        for number in range(sizes['users'])
+    ))
+    batched_create(Category, (
+        Category(name=f'Категория {number}', slug=f'category-{number}')
+        for number in range(sizes['categories'])
+    ))
+    batched_create(Genre, (
+        Genre(name=f'Жанр {number}', slug=f'genre-{number}')
+        for number in range(sizes['genres'])
+    ))
+    user_ids = list(User.objects.order_by('id').values_list('id', flat=True))
+    category_ids = list(
+        Category.objects.order_by('id').values_list('id', flat=True)
+    )
+    genre_ids = list(Genre.objects.order_by('id').values_list('id', flat=True))
+
+    batched_create(Title, (
+        Title(
+            name=f'Произведение {number}',
+            year=1900 + number % 120,
+            description=f'Описание произведения {number}',
+            category_id=category_ids[number % len(category_ids)],
+        )
+        for number in range(sizes['titles'])
+    ))
+    title_ids = list(Title.objects.order_by('id').values_list('id', flat=True))
+    batched_create(Title.genre.through, (
+        Title.genre.through(
+            title_id=title_id,
+            genre_id=genre_ids[(number + shift) % len(genre_ids)],
+        )
+        for number, title_id in enumerate(title_ids)
+        for shift in range(min(2, len(genre_ids)))
+    ))
+    batched_create(Review, (
+        Review(
+            title_id=title_id,
+            author_id=user_ids[(number + shift) % len(user_ids)],
+            text=f'Отзыв {shift} на произведение {title_id}',
+            score=(number + shift) % 10 + 1,
+        )
+        for number, title_id in enumerate(title_ids)
+        for shift in range(sizes['reviews_per_title'])
+    ))
+    Title.objects.rebuild_rating()
+    batched_create(Comment, (
+        Comment(
+            review_id=review_id,
+            author_id=user_ids[(review_id + shift) % len(user_ids)],
+            text=f'Комментарий {shift} к отзыву {review_id}',
+        )
+        for review_id in Review.objects.order_by('id').values_list(
+            'id', flat=True
+        ).iterator(chunk_size=BATCH_SIZE)
+        for shift in range(sizes['comments_per_review'])
+    ))
+    invalidate(CATALOG)
+    return sizes
+
+
+def route_kwargs():
+    admin = User.objects.filter(role=ADMIN).order_by('id').first()
+    review = Review.objects.order_by('id').first()
+    comment = Comment.objects.filter(review=review).order_by('id').first()
+    title = review.title if review else Title.objects.order_by('id').first()
+    return {
+        'title_id': title.id if title else None,
+        'review_id': review.id if review else None,
+        'comment_id': comment.id if comment else None,
+        'username': admin.username,
+        'slug': Category.objects.order_by('id').values_list(
+            'slug', flat=True
+        ).first(),
+    }, admin
+
+
+def collect_routes(kwargs):
+    routes = []
+    for pattern in router.urls:
+        groups = set(pattern.pattern.regex.groupindex)
+        if 'format' in groups:
+            continue
+        actions = getattr(pattern.callback, 'actions', {'get': 'get'})
+        if 'get' not in actions:
+            continue
+        url_kwargs = {}
+        for group in groups:
+            if group == 'pk':
+                value = (
+                    kwargs['comment_id'] if 'review_id' in groups
+                    else kwargs['review_id'] if 'title_id' in groups
+                    else kwargs['title_id']
+                )
+            elif group == 'slug' and pattern.name.startswith('genres'):
+                value = Genre.objects.order_by('id').values_list(
+                    'slug', flat=True
+                ).first()
+            else:
+                value = kwargs[group]
+            url_kwargs[group] = value
+        if None in url_kwargs.values():
+            continue
+        url = reverse(f'api:{pattern.name}', kwargs=url_kwargs)
+        routes.append(('GET', pattern.name, url, None))
+    return routes
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+def measure(client, method, url, data, repeat):
+    """Холодные (кэш ответов сброшен) и тёплые вызовы отдельно.
+
+    Задержки замеряются без CaptureQueriesContext, запросы к базе
+    считаются отдельными вызовами.
+    """
+    def call():
+        if data is None:
+            return client.get(url)
+        return getattr(client, method.lower())(url, data, format='json')
+
+    def timed_call():
+        started = time.perf_counter()
+        response = call()
+        return (time.perf_counter() - started) * 1000, response
+
+    def count_queries():
+        with CaptureQueriesContext(connection) as context:
+            call()
+        return len(context.captured_queries)
+
+    cold, warm = [], []
+    for _ in range(repeat):
+        # Иначе все повторы, кроме первого, отдал бы кэш без запросов
+        invalidate(CATALOG)
+        elapsed, response = timed_call()
+        cold.append(elapsed)
+        elapsed, _ = timed_call()
+        warm.append(elapsed)
+    invalidate(CATALOG)
+    queries = count_queries()
+    warm_queries = count_queries()
+    invalidate(CATALOG)
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'status': response.status_code,
+        'queries': queries,
+        'warm_queries': warm_queries,
+        'p50_ms': round(percentile(cold, 0.50), 3),
+        'p95_ms': round(percentile(cold, 0.95), 3),
+        'warm_p50_ms': round(percentile(warm, 0.50), 3),
+        'warm_p95_ms': round(percentile(warm, 0.95), 3),
+        'peak_memory_kb': round(peak / 1024, 1),
+        'response_bytes': len(response.content),
+    }
+
+
+def run_benchmark(repeat=20):
+    kwargs, admin = route_kwargs()
+    client = APIClient()
+    token = RefreshToken.for_user(admin).access_token
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    routes = collect_routes(kwargs)
+    routes.append((
+        'POST', 'signup', reverse('api:signup'),
+        {'username': admin.username, 'email': admin.email}
+    ))
+    routes.append((
+        'POST', 'gettoken', reverse('api:gettoken'),
+        {
+            'username': admin.username,
+            'confirmation_code': admin.confirmation_code,
+        }
+    ))
+    results = {}
+    # Повторные вызовы signup/token упёрлись бы в лимиты запросов
+    unthrottled = {**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}}
+    with override_settings(REST_FRAMEWORK=unthrottled):
+        for method, name, url, data in routes:
+            result = measure(client, method, url, data, repeat)
+            result['route'] = name
+            results[f'{method} {url}'] = result
+    return results
+
+
+def compare(baseline, current, tolerance=0.2):
+    regressions = []
+    for endpoint, result in sorted(current.items()):
+        old = baseline.get(endpoint)
+        if old is None:
+            continue
+        if result['queries'] > old['queries']:
+            regressions.append(
+                f'{endpoint}: queries {old["queries"]} -> {result["queries"]}'
+            )
+        for key in ('p95_ms', 'warm_p95_ms'):
+            if key in old and result[key] > old[key] * (1 + tolerance):
+                regressions.append(
+                    f'{endpoint}: {key} {old[key]} -> {result[key]}'
+                )
+    return regressions
+
+
+def serializer_querysets():
+    return {
+        'titles': (
+            TitleSerializerRead, TitleViewSet.queryset.all(),
+            {'with_stats': True}
+        ),
+        'reviews': (
+            ReviewSerializer, Review.objects.select_related('author'), {}
+        ),
+        'comments': (
+            CommentSerializer, Comment.objects.select_related('author'), {}
+        ),
+    }
+
+
+def best_time(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def benchmark_serializers(page_sizes=SERIALIZER_PAGE_SIZES, repeat=5):
+    """Объекты в секунду: обычные сериализаторы против CompiledSerializer.
+
+    В обоих случаях время включает запросы к базе за страницей.
+    """
+    renderer = JSONRenderer()
+    results = {}
+    for name, (serializer_class, queryset, context) in (
+        serializer_querysets().items()
+    ):
+        compiled = get_compiled(serializer_class(context=context))
+        for size in page_sizes:
+            regular_time, regular = best_time(
+                lambda: serializer_class(
+                    list(queryset[:size]), many=True, context=context
+                ).data,
+                repeat
+            )
+            compiled_time, fast = best_time(
+                lambda: compiled.to_representation(
+                    list(compiled.values(queryset)[:size])
+                ),
+                repeat
+            )
+            objects = len(regular)
+            results[f'{name}/{size}'] = {
+                'objects': objects,
+                'regular_per_s': round(objects / regular_time),
+                'compiled_per_s': round(objects / compiled_time),
+                'speedup': round(regular_time / compiled_time, 2),
+                'identical': renderer.render(regular) == renderer.render(fast),
+            }
+    return results
+
+
+def benchmark_renderers(page_sizes=RENDERER_PAGE_SIZES, repeat=20):
+    """Ответов в секунду: JSONRenderer из DRF против быстрых кодировщиков.
+
+    Данные — страницы /titles/?stats=1 и /reviews/ в том виде, в каком
+    их получает рендерер.
+    """
+    baseline = JSONRenderer()
+    backends = [name for name, backend in JSON_BACKENDS.items() if backend]
+    results = {}
+    querysets = serializer_querysets()
+    for name in ('titles', 'reviews'):
+        serializer_class, queryset, context = querysets[name]
+        compiled = get_compiled(serializer_class(context=context))
+        for size in page_sizes:
+            data = {
+                'count': queryset.count(),
+                'next': None,
+                'previous': None,
+                'results': compiled.to_representation(
+                    list(compiled.values(queryset)[:size])
+                ),
+            }
+            baseline_time, expected = best_time(
+                lambda: baseline.render(data), repeat
+            )
+            result = results[f'{name}/{size}'] = {
+                'bytes': len(expected),
+                'renders_per_s': {'json': round(1 / baseline_time)},
+                'identical': {},
+            }
+            for backend in backends:
+                with override_settings(API_JSON_BACKEND=backend):
+                    renderer = FastJSONRenderer()
+                    backend_time, content = best_time(
+                        lambda: renderer.render(data), repeat
+                    )
+                result['renders_per_s'][backend] = round(1 / backend_time)
+                result['identical'][backend] = content == expected
+    return results
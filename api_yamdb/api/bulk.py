@@ -0,0 +1,206 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .cache import CATALOG, invalidate_on_commit
+
+
+class BulkModelMixin:
+    """Массовые create/update/delete через `<prefix>/bulk/`.
+
+    POST принимает список объектов, PATCH — список объектов с полем
+    `bulk_lookup_field`, DELETE — список значений этого поля. Все записи
+    выполняются в одной транзакции, ответ содержит результат для каждого
+    элемента в порядке запроса. Массовые операции не вызывают сигналы,
+    поэтому кэш каталога сбрасывается целиком.
+    """
+    bulk_lookup_field = 'slug'
+    bulk_serializer_class = None
+    bulk_unique_fields = ()
+
+    @action(methods=('post', 'patch', 'delete'), detail=False)
+    def bulk(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            raise serializers.ValidationError('Ожидается список объектов')
+        if len(items) > settings.BULK_MAX_ITEMS:
+            raise serializers.ValidationError(
+                f'Не больше {settings.BULK_MAX_ITEMS} объектов за запрос'
+            )
+        handler = {
+            'POST': self.bulk_create,
+            'PATCH': self.bulk_update,
+            'DELETE': self.bulk_destroy,
+        }[request.method]
+        with transaction.atomic():
+            results = handler(items)
+            invalidate_on_commit(CATALOG)
+        return Response(results, status=status.HTTP_200_OK)
+
+    def get_bulk_model(self):
+        return self.get_queryset().model
+
+    def get_bulk_serializer(self, *args, **kwargs):
+        serializer_class = self.bulk_serializer_class or self.serializer_class
+        return serializer_class(*args, **kwargs)
+
+    def get_bulk_context(self, items):
+        return {
+            **self.get_serializer_context(),
+            'preloaded': self.preload_related(
+                [item for item in items if isinstance(item, dict)]
+            ),
+        }
+
+    def preload_related(self, items):
+        return {}
+
+    def bulk_create(self, items):
+        context = self.get_bulk_context(items)
+        results = [None] * len(items)
+        valid = []
+        for index, item in enumerate(items):
+            serializer = self.get_bulk_serializer(data=item, context=context)
+            if serializer.is_valid():
+                valid.append((index, None, serializer.validated_data))
+            else:
+                results[index] = bulk_error(serializer.errors)
+        valid = self.check_unique(valid, results)
+        created = self.perform_bulk_create([data for _, _, data in valid])
+        for (index, _, _), obj in zip(valid, created):
+            results[index] = self.bulk_result(obj, status.HTTP_201_CREATED)
+        return results
+
+    def bulk_update(self, items):
+        lookup = self.bulk_lookup_field
+        context = self.get_bulk_context(items)
+        results = [None] * len(items)
+        values = {}
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or lookup not in item:
+                results[index] = bulk_error({lookup: ['Обязательное поле.']})
+                continue
+            try:
+                values[index] = self.to_lookup_value(item[lookup])
+            except (TypeError, ValidationError):
+                results[index] = bulk_invalid_lookup(lookup, item[lookup])
+        instances = self.get_bulk_model().objects.in_bulk(
+            set(values.values()), field_name=lookup
+        )
+        valid = []
+        for index, value in values.items():
+            item = items[index]
+            instance = instances.get(value)
+            if instance is None:
+                results[index] = bulk_not_found(lookup, value)
+                continue
+            data = {key: item[key] for key in item if key != lookup}
+            serializer = self.get_bulk_serializer(
+                instance, data=data, partial=True, context=context
+            )
+            if serializer.is_valid():
+                valid.append((index, instance, serializer.validated_data))
+            else:
+                results[index] = bulk_error(serializer.errors)
+        valid = self.check_unique(valid, results)
+        self.perform_bulk_update(
+            [(instance, data) for _, instance, data in valid]
+        )
+        for index, instance, _ in valid:
+            results[index] = self.bulk_result(instance, status.HTTP_200_OK)
+        return results
+
+    def bulk_destroy(self, items):
+        lookup = self.bulk_lookup_field
+        results = [None] * len(items)
+        values = {}
+        for index, item in enumerate(items):
+            try:
+                values[index] = self.to_lookup_value(item)
+            except (TypeError, ValidationError):
+                results[index] = bulk_invalid_lookup(lookup, item)
+        queryset = self.get_bulk_model().objects.filter(
+            **{f'{lookup}__in': set(values.values())}
+        )
+        existing = set(queryset.values_list(lookup, flat=True))
+        queryset.delete()
+        for index, value in values.items():
+            if value in existing:
+                results[index] = {
+                    'status': status.HTTP_204_NO_CONTENT, lookup: value
+                }
+            else:
+                results[index] = bulk_not_found(lookup, value)
+        return results
+
+    def to_lookup_value(self, value):
+        if not isinstance(value, (str, int)) or isinstance(value, bool):
+            raise TypeError(value)
+        field = self.get_bulk_model()._meta.get_field(self.bulk_lookup_field)
+        return field.to_python(value)
+
+    def check_unique(self, valid, results):
+        """Уникальность проверяется одним запросом на поле, а не на объект."""
+        model = self.get_bulk_model()
+        for field in self.bulk_unique_fields:
+            changed = [
+                (index, instance, data) for index, instance, data in valid
+                if field in data and (
+                    instance is None or getattr(instance, field) != data[field]
+                )
+            ]
+            taken = set(model.objects.filter(
+                **{f'{field}__in': [data[field] for _, _, data in changed]}
+            ).values_list(field, flat=True))
+            seen = set()
+            rejected = set()
+            for index, _, data in changed:
+                if data[field] in seen:
+                    message = 'Значение повторяется в запросе.'
+                elif data[field] in taken:
+                    message = 'Объект с таким значением уже существует.'
+                else:
+                    seen.add(data[field])
+                    continue
+                results[index] = bulk_error({field: [message]})
+                rejected.add(index)
+            valid = [item for item in valid if item[0] not in rejected]
+        return valid
+
+    def perform_bulk_create(self, validated):
+        model = self.get_bulk_model()
+        return model.objects.bulk_create([model(**data) for data in validated])
+
+    def perform_bulk_update(self, pairs):
+        fields = set()
+        for instance, data in pairs:
+            for field, value in data.items():
+                setattr(instance, field, value)
+                fields.add(field)
+        if fields:
+            self.get_bulk_model().objects.bulk_update(
+                [instance for instance, _ in pairs], fields
+            )
+
+    def bulk_result(self, obj, status_code):
+        lookup = self.bulk_lookup_field
+        return {'status': status_code, lookup: getattr(obj, lookup)}
+
+
+def bulk_invalid_lookup(lookup, value):
+    return bulk_error({lookup: [f'Некорректное значение {value!r}.']})
+
+
+def bulk_error(errors):
+    return {'status': status.HTTP_400_BAD_REQUEST, 'errors': errors}
+
+
+def bulk_not_found(lookup, value):
+    return {
+        'status': status.HTTP_404_NOT_FOUND,
+        lookup: value,
+        'errors': {'detail': 'Страница не найдена.'},
+    }
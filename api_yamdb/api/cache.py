@@ -0,0 +1,155 @@
+import hashlib
+import time
+from contextlib import nullcontext
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag, urlencode
+
+from reviews.models import Category, Genre, GenreTitle, Review, Title
+from .routers import use_primary
+
+GENERATION_KEY = 'api-generation:{}'
+RESPONSE_KEY = 'api-response:{}'
+# Общее пространство для массовых операций (загрузка CSV, пересчёт рейтинга)
+CATALOG = 'catalog'
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def invalidate(*namespaces):
+    now = time.time()
+    get_cache().set_many(
+        {GENERATION_KEY.format(namespace): now for namespace in namespaces},
+        timeout=None
+    )
+
+
+def invalidate_on_commit(*namespaces):
+    transaction.on_commit(partial(invalidate, *namespaces))
+
+
+def get_generations(namespaces):
+    cache = get_cache()
+    keys = [GENERATION_KEY.format(namespace) for namespace in namespaces]
+    generations = cache.get_many(keys)
+    missing = {key: time.time() for key in keys if key not in generations}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        generations.update(missing)
+    return [generations[key] for key in keys]
+
+
+class CachedResponseMixin:
+    cache_namespaces = ()
+
+    def get_cache_namespaces(self):
+        return (CATALOG, *self.cache_namespaces)
+
+    def get_response_key(self, request, namespaces, generations):
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        raw_key = '|'.join((
+            ','.join(f'{namespace}={generation!r}' for namespace, generation
+                     in zip(namespaces, generations)),
+            request.accepted_media_type,
+            # Ссылки next/previous в ответе абсолютные
+            request.scheme,
+            request.get_host(),
+            request.path,
+            query,
+        ))
+        return RESPONSE_KEY.format(hashlib.md5(raw_key.encode()).hexdigest())
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if request.accepted_renderer.format != 'json':
+            return handler(request, *args, **kwargs)
+        namespaces = self.get_cache_namespaces()
+        generations = get_generations(namespaces)
+        key = self.get_response_key(request, namespaces, generations)
+        cache = get_cache()
+        cached = cache.get(key)
+        if cached is None:
+            # Свежие изменения могли ещё не дойти до реплик
+            recent = (
+                time.time() - max(generations)
+                < settings.DATABASE_REPLICA_STICKY_SECONDS
+            )
+            with use_primary() if recent else nullcontext():
+                response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            response.accepted_renderer = request.accepted_renderer
+            response.accepted_media_type = request.accepted_media_type
+            response.renderer_context = self.get_renderer_context()
+            response.render()
+            cached = {
+                'content': response.content,
+                'content_type': response['Content-Type'],
+                'etag': quote_etag(hashlib.md5(response.content).hexdigest()),
+            }
+            cache.set(key, cached, settings.API_CACHE_TIMEOUT)
+        last_modified = int(max(generations))
+        response = HttpResponse(
+            cached['content'], content_type=cached['content_type']
+        )
+        response['ETag'] = cached['etag']
+        response['Last-Modified'] = http_date(last_modified)
+        return get_conditional_response(
+            request,
+            etag=cached['etag'],
+            last_modified=last_modified,
+            response=response
+        )
+
+
+class CachedListMixin(CachedResponseMixin):
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+
+@receiver((post_save, post_delete), sender=Category)
+def category_changed(sender, instance, **kwargs):
+    invalidate_on_commit('categories')
+
+
+@receiver((post_save, post_delete), sender=Genre)
+def genre_changed(sender, instance, **kwargs):
+    invalidate_on_commit('genres')
+
+
+@receiver((post_save, post_delete), sender=Title)
+def title_changed(sender, instance, **kwargs):
+    invalidate_on_commit('titles', f'title:{instance.pk}')
+
+
+@receiver((post_save, post_delete), sender=GenreTitle)
+@receiver((post_save, post_delete), sender=Review)
+def title_child_changed(sender, instance, **kwargs):
+    invalidate_on_commit('titles', f'title:{instance.title_id}')
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        invalidate_on_commit('titles', f'title:{instance.pk}')
+    elif pk_set is None:
+        invalidate_on_commit('titles', 'genres')
+    else:
+        invalidate_on_commit(
+            'titles', *(f'title:{title_id}' for title_id in pk_set)
+        )
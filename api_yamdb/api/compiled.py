@@ -0,0 +1,218 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from reviews.models import SCORES, Title
+from .metrics import MeasuredSerializerMixin, measure_serialization
+from .pagination import get_ordering_columns
+
+# Свойства моделей, которые собираются из колонок:
+# (модель, атрибут) -> (колонки, функция от их значений)
+PROPERTY_COLUMNS = {
+    (Title, 'scores'): (
+        tuple(f'score_{score}' for score in SCORES),
+        lambda *counts: dict(zip(SCORES, counts)),
+    ),
+}
+# Поля, у которых to_representation совпадает со встроенной функцией
+FAST_CONVERTERS = {
+    serializers.CharField: str,
+    serializers.IntegerField: int,
+}
+
+
+class NotCompilable(Exception):
+    pass
+
+
+def get_converter(field):
+    return FAST_CONVERTERS.get(type(field), field.to_representation)
+
+
+def check_serializer(serializer):
+    # Свой to_representation схемой полей не описать
+    if type(serializer).to_representation not in (
+        serializers.Serializer.to_representation,
+        MeasuredSerializerMixin.to_representation,
+    ):
+        raise NotCompilable(type(serializer).__name__)
+
+
+def nullable(converter):
+    def convert(value):
+        return None if value is None else converter(value)
+    return convert
+
+
+class CompiledSerializer:
+    """Сериализатор списка только для чтения по строкам `.values()`.
+
+    Схема собирается один раз из полей сериализатора: простые поля и
+    свойства из PROPERTY_COLUMNS читаются из колонок, SlugRelatedField
+    и вложенный сериализатор внешнего ключа — через join в том же
+    запросе, вложенный список по many-to-many — одним запросом на
+    страницу. Значения преобразуют сами поля DRF, поэтому JSON
+    совпадает с обычным сериализатором.
+    """
+
+    def __init__(self, serializer):
+        check_serializer(serializer)
+        self.model = serializer.Meta.model
+        self.columns = []
+        self.writers = []
+        self.many_related = []
+        for name, field in serializer.fields.items():
+            self.writers.append((name, self.compile_field(field)))
+
+    def add_columns(self, *columns):
+        for column in columns:
+            if column not in self.columns:
+                self.columns.append(column)
+
+    def compile_field(self, field):
+        source = field.source
+        if source == '*' or '.' in source:
+            raise NotCompilable(source)
+        if isinstance(field, serializers.ListSerializer):
+            return self.compile_many(field)
+        if isinstance(field, serializers.ModelSerializer):
+            return self.compile_nested(field)
+        if isinstance(field, serializers.SlugRelatedField):
+            column = f'{source}__{field.slug_field}'
+            self.add_columns(column)
+            return lambda row, related: row[column]
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            if field.pk_field is not None:
+                raise NotCompilable(source)
+            self.add_columns(source)
+            return lambda row, related: row[source]
+        if isinstance(field, serializers.RelatedField):
+            raise NotCompilable(source)
+        converter = nullable(get_converter(field))
+        if (self.model, source) in PROPERTY_COLUMNS:
+            columns, build = PROPERTY_COLUMNS[self.model, source]
+            self.add_columns(*columns)
+            return lambda row, related: converter(
+                build(*(row[column] for column in columns))
+            )
+        if self.model._meta.get_field(source).is_relation:
+            raise NotCompilable(source)
+        self.add_columns(source)
+        return lambda row, related: converter(row[source])
+
+    def compile_nested(self, serializer):
+        check_serializer(serializer)
+        source = serializer.source
+        self.add_columns(source)
+        fields = []
+        for name, field in serializer.fields.items():
+            if isinstance(field, (serializers.RelatedField,
+                                  serializers.BaseSerializer)):
+                raise NotCompilable(f'{source}.{name}')
+            column = f'{source}__{field.source}'
+            self.add_columns(column)
+            fields.append((name, column, nullable(get_converter(field))))
+
+        def write(row, related):
+            if row[source] is None:
+                return None
+            return {
+                name: converter(row[column])
+                for name, column, converter in fields
+            }
+        return write
+
+    def compile_many(self, list_serializer):
+        source = list_serializer.source
+        child = list_serializer.child
+        relation = self.model._meta.get_field(source)
+        if not relation.many_to_many or not isinstance(
+            child, serializers.ModelSerializer
+        ):
+            raise NotCompilable(source)
+        check_serializer(child)
+        from_column = f'{relation.m2m_field_name()}_id'
+        to_name = relation.m2m_reverse_field_name()
+        fields = []
+        for name, field in child.fields.items():
+            if isinstance(field, (serializers.RelatedField,
+                                  serializers.BaseSerializer)):
+                raise NotCompilable(f'{source}.{name}')
+            fields.append((name, nullable(get_converter(field))))
+        columns = [
+            f'{to_name}__{field.source}' for field in child.fields.values()
+        ]
+        self.add_columns('pk')
+        self.many_related.append(
+            (source, relation.remote_field.through, from_column, to_name,
+             columns, fields)
+        )
+        return lambda row, related: related[source].get(row['pk'], [])
+
+    def values(self, queryset, *extra):
+        return queryset.values(*self.columns, *extra)
+
+    def fetch_many(self, rows):
+        related = {}
+        if not self.many_related:
+            return related
+        ids = [row['pk'] for row in rows]
+        for (source, through, from_column, to_name, columns,
+             fields) in self.many_related:
+            items = related[source] = {}
+            if not ids:
+                continue
+            for owner_id, *values in through.objects.filter(**{
+                f'{from_column}__in': ids
+            }).order_by(from_column, f'{to_name}_id').values_list(
+                from_column, *columns
+            ):
+                items.setdefault(owner_id, []).append({
+                    name: converter(value)
+                    for (name, converter), value in zip(fields, values)
+                })
+        return related
+
+    def to_representation(self, rows):
+        with measure_serialization():
+            related = self.fetch_many(rows)
+            writers = self.writers
+            return [
+                {name: write(row, related) for name, write in writers}
+                for row in rows
+            ]
+
+
+compiled_serializers = {}
+
+
+def get_compiled(serializer):
+    """CompiledSerializer для набора полей или None, если не собрать."""
+    key = (type(serializer), tuple(serializer.fields))
+    if key not in compiled_serializers:
+        try:
+            compiled_serializers[key] = CompiledSerializer(serializer)
+        except (NotCompilable, FieldDoesNotExist):
+            compiled_serializers[key] = None
+        # Поля остаются в схеме, а запрос в их контексте больше не нужен
+        serializer._context = {}
+    return compiled_serializers[key]
+
+
+class CompiledListMixin:
+    """list без экземпляров моделей, если сериализатор компилируется."""
+
+    def list(self, request, *args, **kwargs):
+        compiled = get_compiled(self.get_serializer())
+        if compiled is None:
+            return super().list(request, *args, **kwargs)
+        queryset = compiled.values(
+            self.filter_queryset(self.get_queryset()),
+            'pk', *get_ordering_columns(self.paginator)
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                compiled.to_representation(page)
+            )
+        return Response(compiled.to_representation(list(queryset)))
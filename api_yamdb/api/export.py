@@ -0,0 +1,189 @@
+import csv
+import datetime as dt
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from reviews.models import Comment, Review, Title
+
+CHUNK_SIZE = 2000
+BUFFER_SIZE = 64 * 1024
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+class Export:
+    """Потоковая выгрузка: строки читаются итератором по CHUNK_SIZE."""
+    model = None
+    # Поле values() -> имя колонки в выгрузке
+    fields = {}
+    incremental_by_date = True
+
+    def __init__(self, since=None, since_id=None, using=None):
+        self.since = since
+        self.since_id = since_id
+        self.using = using
+
+    @property
+    def columns(self):
+        return list(self.fields.values())
+
+    def get_queryset(self):
+        queryset = self.model.objects.all()
+        if self.using is not None:
+            queryset = queryset.using(self.using)
+        if self.since is not None:
+            queryset = queryset.filter(pub_date__gt=self.since)
+        if self.since_id is not None:
+            queryset = queryset.filter(id__gt=self.since_id)
+        return queryset.order_by('id')
+
+    def rows(self):
+        for values in self.get_queryset().values_list(
+            *self.fields
+        ).iterator(chunk_size=CHUNK_SIZE):
+            yield dict(zip(self.columns, values))
+
+
+class TitleExport(Export):
+    model = Title
+    fields = {
+        'id': 'id',
+        'name': 'name',
+        'year': 'year',
+        'description': 'description',
+        'category__slug': 'category',
+        'rating': 'rating',
+        'rating_count': 'review_count',
+    }
+    incremental_by_date = False
+
+    @property
+    def columns(self):
+        return [*super().columns, 'genre']
+
+    def rows(self):
+        # Жанры идут вторым потоком, отсортированным так же по id
+        links = Title.genre.through.objects.using(
+            self.get_queryset().db
+        ).filter(
+            title__in=self.get_queryset()
+        ).order_by('title_id', 'genre__slug').values_list(
+            'title_id', 'genre__slug'
+        ).iterator(chunk_size=CHUNK_SIZE)
+        link = next(links, None)
+        for row in super().rows():
+            while link is not None and link[0] < row['id']:
+                link = next(links, None)
+            genres = []
+            while link is not None and link[0] == row['id']:
+                genres.append(link[1])
+                link = next(links, None)
+            row['genre'] = genres
+            yield row
+
+
+class ReviewExport(Export):
+    model = Review
+    fields = {
+        'id': 'id',
+        'title_id': 'title_id',
+        'author__username': 'author',
+        'text': 'text',
+        'score': 'score',
+        'pub_date': 'pub_date',
+    }
+
+
+class CommentExport(Export):
+    model = Comment
+    fields = {
+        'id': 'id',
+        'review__title_id': 'title_id',
+        'review_id': 'review_id',
+        'author__username': 'author',
+        'text': 'text',
+        'pub_date': 'pub_date',
+    }
+
+
+EXPORTS = {
+    'titles': TitleExport,
+    'reviews': ReviewExport,
+    'comments': CommentExport,
+}
+
+
+def parse_since(value):
+    since = parse_datetime(value)
+    if since is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(f'Некорректная дата {value!r}')
+        since = dt.datetime.combine(date, dt.time.min)
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def build_export(dataset, since=None, since_id=None, using=None):
+    export_class = EXPORTS[dataset]
+    if since:
+        if not export_class.incremental_by_date:
+            raise ValueError(
+                f'Выгрузку {dataset} можно продолжить только по since_id'
+            )
+        since = parse_since(since)
+    if since_id not in (None, ''):
+        try:
+            since_id = int(since_id)
+        except (TypeError, ValueError):
+            raise ValueError(f'Некорректный since_id {since_id!r}')
+    return export_class(since or None, since_id or None, using=using)
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def ndjson_lines(export):
+    for row in export.rows():
+        yield json.dumps(row, ensure_ascii=False, cls=DjangoJSONEncoder) + '\n'
+
+
+def csv_lines(export):
+    writer = csv.writer(Echo())
+    yield writer.writerow(export.columns)
+    for row in export.rows():
+        yield writer.writerow([
+            ','.join(value) if isinstance(value, list)
+            else value.isoformat() if isinstance(value, dt.datetime)
+            else value
+            for value in row.values()
+        ])
+
+
+WRITERS = {
+    'ndjson': ndjson_lines,
+    'csv': csv_lines,
+}
+
+
+def stream(export, file_format):
+    """Склеивает строки в куски по BUFFER_SIZE символов."""
+    buffer = []
+    size = 0
+    for line in WRITERS[file_format](export):
+        buffer.append(line)
+        size += len(line)
+        if size >= BUFFER_SIZE:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer)
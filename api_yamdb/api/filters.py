@@ -8,7 +8,11 @@ class TitleFilter(filters.FilterSet):
     genre = filters.CharFilter(field_name='genre__slug')
     name = filters.CharFilter(field_name='name', lookup_expr='contains')
     year = filters.NumberFilter(field_name='year')
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('category', 'genre', 'name', 'year')
+        fields = ('category', 'genre', 'name', 'year', 'search')
+
+    def filter_search(self, queryset, name, value):
+        return queryset.search(value)
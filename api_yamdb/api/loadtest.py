@@ -0,0 +1,233 @@
+import asyncio
+import http
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+from django.core.handlers.wsgi import WSGIHandler
+
+from api_yamdb.handlers.asgi import ASGIHandler
+from .benchmark import collect_routes, percentile, route_kwargs
+
+READ_ROUTES = (
+    'categories-list', 'genres-list', 'titles-list', 'titles-detail',
+    'reviews-list', 'reviews-detail', 'comments-list', 'comments-detail',
+)
+HOST = '127.0.0.1'
+BACKLOG = 1024
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class PooledWSGIServer(WSGIServer):
+    """WSGI-сервер с пулом из `threads` потоков, как gunicorn --threads."""
+    request_queue_size = BACKLOG
+
+    def __init__(self, threads):
+        super().__init__((HOST, 0), QuietHandler)
+        self.set_app(WSGIHandler())
+        self.executor = ThreadPoolExecutor(max_workers=threads)
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self.process_pooled, request, client_address)
+
+    def process_pooled(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self.server_address[:2]
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+        self.executor.shutdown()
+
+
+async def serve_asgi(app, reader, writer):
+    """Один запрос HTTP/1.1 на соединение, ответ до закрытия соединения."""
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+        request_line, *lines = head[:-4].decode('iso-8859-1').split('\r\n')
+        method, target, version = request_line.split(' ', 2)
+        headers = [
+            (name.strip().lower().encode('iso-8859-1'),
+             value.strip().encode('iso-8859-1'))
+            for name, value in (line.split(':', 1) for line in lines)
+        ]
+        length = int(dict(headers).get(b'content-length', 0))
+        body = await reader.readexactly(length) if length else b''
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+            ValueError):
+        writer.close()
+        return
+    path, _, query = target.partition('?')
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': version.partition('/')[2],
+        'method': method,
+        'scheme': 'http',
+        'path': unquote(path),
+        'raw_path': path.encode('iso-8859-1'),
+        'query_string': query.encode('iso-8859-1'),
+        'root_path': '',
+        'headers': headers,
+        'client': writer.get_extra_info('peername')[:2],
+        'server': writer.get_extra_info('sockname')[:2],
+    }
+    messages = [{'type': 'http.request', 'body': body}]
+
+    async def receive():
+        return messages.pop() if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status = message['status']
+            writer.write(
+                f'HTTP/1.1 {status} {http.HTTPStatus(status).phrase}\r\n'
+                'Connection: close\r\n'.encode('iso-8859-1')
+                + b''.join(
+                    name + b': ' + value + b'\r\n'
+                    for name, value in message['headers']
+                )
+                + b'\r\n'
+            )
+        else:
+            writer.write(message.get('body', b''))
+        await writer.drain()
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        writer.close()
+
+
+class ASGIServer:
+    """Цикл событий с ASGI-приложением в отдельном потоке."""
+
+    def __init__(self, threads):
+        self.app = ASGIHandler(threads=threads)
+        self.ready = threading.Event()
+
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        server = self.loop.run_until_complete(asyncio.start_server(
+            lambda reader, writer: serve_asgi(self.app, reader, writer),
+            HOST, 0, backlog=BACKLOG
+        ))
+        self.address = server.sockets[0].getsockname()[:2]
+        self.ready.set()
+        self.loop.run_forever()
+        server.close()
+        self.loop.run_until_complete(server.wait_closed())
+        self.loop.close()
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        return self.address
+
+    def __exit__(self, *args):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.app.executor.shutdown()
+
+
+async def fetch(address, url, client_delay):
+    """GET; медленный клиент досылает запрос через client_delay секунд."""
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection(*address)
+    writer.write(f'GET {url} HTTP/1.1\r\n'.encode())
+    await writer.drain()
+    if client_delay:
+        await asyncio.sleep(client_delay)
+    writer.write(f'Host: {address[0]}\r\nConnection: close\r\n\r\n'.encode())
+    response = await reader.read()
+    writer.close()
+    status = int(response.split(b' ', 2)[1]) if response else 0
+    return status, time.perf_counter() - started
+
+
+async def generate_load(address, urls, requests, concurrency,
+                        slow_clients, client_delay):
+    """`requests` быстрых запросов на фоне `slow_clients` медленных.
+
+    Медленные клиенты подключаются первыми и передают каждый запрос
+    client_delay секунд; учитываются только быстрые запросы.
+    """
+    statuses = Counter()
+    timings = []
+    queue = iter(range(requests))
+    done = asyncio.Event()
+
+    async def slow_worker(number):
+        while not done.is_set():
+            await fetch(address, urls[number % len(urls)], client_delay)
+
+    async def worker():
+        for number in queue:
+            status, duration = await fetch(
+                address, urls[number % len(urls)], 0
+            )
+            statuses[status] += 1
+            timings.append(duration * 1000)
+
+    slow = [
+        asyncio.ensure_future(slow_worker(number))
+        for number in range(slow_clients)
+    ]
+    # Даём медленным клиентам занять соединения первыми
+    await asyncio.sleep(min(client_delay, 0.1))
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await asyncio.gather(*slow)
+    return {
+        'requests': requests,
+        'errors': requests - statuses[200],
+        'rps': round(requests / elapsed, 1),
+        'p50_ms': round(percentile(timings, 0.50), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+    }
+
+
+SERVERS = {
+    'wsgi': PooledWSGIServer,
+    'asgi': ASGIServer,
+}
+
+
+def run_loadtest(requests=2000, concurrency=20, threads=8,
+                 slow_clients=32, client_delay=1.0):
+    """Пропускная способность WSGI и ASGI на одних данных и эндпоинтах.
+
+    Серверы и клиенты работают в одном процессе, поэтому важны не
+    абсолютные числа, а их соотношение при одинаковом числе потоков.
+    """
+    kwargs, _ = route_kwargs()
+    urls = [
+        url for _, name, url, _ in collect_routes(kwargs)
+        if name in READ_ROUTES
+    ]
+    results = {}
+    for mode, server_class in SERVERS.items():
+        with server_class(threads) as address:
+            results[mode] = asyncio.run(generate_load(
+                address, urls, requests, concurrency, slow_clients,
+                client_delay
+            ))
+    return results
@@ -0,0 +1,109 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from api.benchmark import (DEFAULT_SIZES, benchmark_renderers,
+                           benchmark_serializers, compare, run_benchmark,
+                           seed)
+
+
+class Command(BaseCommand):
+    help = (
+        'Seeds a synthetic dataset in a test database and records query '
+        'count, latency and peak memory for every /api/v1/ endpoint'
+    )
+
+    def add_arguments(self, parser):
+        for name, default in DEFAULT_SIZES.items():
+            parser.add_argument(
+                f'--{name.replace("_", "-")}', type=int, default=default
+            )
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument(
+            '--output', default='benchmark.json',
+            help='Path of the JSON report',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='Previous JSON report to check the new one against',
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Allowed relative p95 slowdown against the baseline',
+        )
+        parser.add_argument(
+            '--serializers', action='store_true',
+            help='Also compare regular and compiled list serialization',
+        )
+        parser.add_argument(
+            '--renderers', action='store_true',
+            help='Also compare JSON rendering with the available encoders',
+        )
+
+    def handle(self, *args, **options):
+        sizes = {name: options[name] for name in DEFAULT_SIZES}
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True
+        )
+        try:
+            with override_settings(
+                EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'
+            ):
+                self.stdout.write(f'Seeding dataset: {sizes}')
+                seed(sizes)
+                results = run_benchmark(options['repeat'])
+                serializers = (
+                    benchmark_serializers() if options['serializers']
+                    else None
+                )
+                renderers = (
+                    benchmark_renderers() if options['renderers'] else None
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = {'dataset': sizes, 'repeat': options['repeat'],
+                  'endpoints': results}
+        if serializers is not None:
+            report['serializers'] = serializers
+        if renderers is not None:
+            report['renderers'] = renderers
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+        for endpoint, result in sorted(results.items()):
+            self.stdout.write(
+                f'{endpoint}: {result["status"]} '
+                f'queries={result["queries"]} '
+                f'p50={result["p50_ms"]}ms p95={result["p95_ms"]}ms '
+                f'warm: queries={result["warm_queries"]} '
+                f'p50={result["warm_p50_ms"]}ms '
+                f'p95={result["warm_p95_ms"]}ms '
+                f'peak={result["peak_memory_kb"]}KB'
+            )
+        for name, result in (serializers or {}).items():
+            self.stdout.write(
+                f'{name}: {result["objects"]} objects '
+                f'regular={result["regular_per_s"]}/s '
+                f'compiled={result["compiled_per_s"]}/s '
+                f'x{result["speedup"]} identical={result["identical"]}'
+            )
+        for name, result in (renderers or {}).items():
+            self.stdout.write(
+                f'{name}: {result["bytes"]} bytes ' + ' '.join(
+                    f'{backend}={per_s}/s'
+                    for backend, per_s in result['renders_per_s'].items()
+                ) + f' identical={result["identical"]}'
+            )
+        self.stdout.write(f'Report written to {options["output"]}')
+
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as file:
+                baseline = json.load(file)['endpoints']
+            regressions = compare(baseline, results, options['tolerance'])
+            if regressions:
+                raise CommandError(
+                    'Performance regressions:\n' + '\n'.join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS('No regressions found'))
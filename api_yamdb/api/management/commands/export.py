@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.export import CONTENT_TYPES, EXPORTS, build_export, stream
+
+
+class Command(BaseCommand):
+    help = 'Streams titles, reviews or comments as NDJSON or CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(EXPORTS))
+        parser.add_argument(
+            '--format',
+            dest='file_format',
+            choices=sorted(CONTENT_TYPES),
+            default='ndjson'
+        )
+        parser.add_argument(
+            '--since',
+            help='Export only rows with pub_date after this date or datetime',
+        )
+        parser.add_argument(
+            '--since-id',
+            help='Export only rows with id greater than this one',
+        )
+        parser.add_argument(
+            '--output',
+            help='File to write to, stdout by default',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            export = build_export(
+                options['dataset'],
+                since=options['since'],
+                since_id=options['since_id']
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        if not options['output']:
+            for chunk in stream(export, options['file_format']):
+                self.stdout.write(chunk, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            for chunk in stream(export, options['file_format']):
+                file.write(chunk)
@@ -0,0 +1,79 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from api.benchmark import DEFAULT_SIZES, seed
+from api.loadtest import run_loadtest
+
+
+class Command(BaseCommand):
+    help = (
+        'Seeds a synthetic dataset in a test database and compares WSGI '
+        'and ASGI throughput of the read endpoints under slow clients'
+    )
+
+    def add_arguments(self, parser):
+        for name, default in DEFAULT_SIZES.items():
+            parser.add_argument(
+                f'--{name.replace("_", "-")}', type=int, default=default
+            )
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument(
+            '--concurrency', type=int, default=20,
+            help='Concurrent fast clients whose requests are measured',
+        )
+        parser.add_argument(
+            '--threads', type=int, default=8,
+            help='Worker threads of both servers',
+        )
+        parser.add_argument(
+            '--slow-clients', type=int, default=32,
+            help='Background clients that send each request slowly',
+        )
+        parser.add_argument(
+            '--client-delay', type=float, default=1.0,
+            help='Seconds a slow client pauses in the middle of its request',
+        )
+        parser.add_argument(
+            '--output', default='loadtest.json',
+            help='Path of the JSON report',
+        )
+
+    def handle(self, *args, **options):
+        sizes = {name: options[name] for name in DEFAULT_SIZES}
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True
+        )
+        try:
+            self.stdout.write(f'Seeding dataset: {sizes}')
+            seed(sizes)
+            results = run_loadtest(
+                requests=options['requests'],
+                concurrency=options['concurrency'],
+                threads=options['threads'],
+                slow_clients=options['slow_clients'],
+                client_delay=options['client_delay'],
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = {
+            'dataset': sizes,
+            **{
+                name: options[name] for name in (
+                    'requests', 'concurrency', 'threads', 'slow_clients',
+                    'client_delay',
+                )
+            },
+            'servers': results,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+        for mode, result in results.items():
+            self.stdout.write(
+                f'{mode}: {result["rps"]} req/s '
+                f'p50={result["p50_ms"]}ms p95={result["p95_ms"]}ms '
+                f'errors={result["errors"]}'
+            )
+        self.stdout.write(f'Report written to {options["output"]}')
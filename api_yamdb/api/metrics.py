@@ -0,0 +1,252 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from django.conf import settings
+
+from users.models import EmailOutbox
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+DELIVERY_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+
+# Имя метрики -> (описание, границы корзин)
+HISTOGRAMS = {
+    'api_request_duration_seconds': (
+        'Время обработки запроса', DURATION_BUCKETS
+    ),
+    'api_db_queries': ('Число запросов к базе за запрос', QUERY_BUCKETS),
+    'api_db_duration_seconds': (
+        'Время запросов к базе за запрос', DURATION_BUCKETS
+    ),
+    'api_serializer_duration_seconds': (
+        'Время сериализации ответа', DURATION_BUCKETS
+    ),
+    'api_response_size_bytes': ('Размер тела ответа', SIZE_BUCKETS),
+    'email_delivery_seconds': (
+        'Время от постановки письма в очередь до отправки', DELIVERY_BUCKETS
+    ),
+}
+# Имя метрики -> описание; значения считаются при опросе
+GAUGES = {
+    'email_outbox_depth': 'Неотправленных писем в очереди',
+    'email_outbox_oldest_pending_seconds': (
+        'Возраст самого старого неотправленного письма'
+    ),
+    'email_outbox_given_up': 'Писем, исчерпавших попытки отправки',
+}
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+request_metrics = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    __slots__ = (
+        'view', 'queries', 'db_time', 'serializer_time', 'serializing'
+    )
+
+    def __init__(self):
+        self.view = None
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper: время каждого запроса к базе
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+
+def track_queries(connections, wrapper):
+    """Подключает execute_wrapper ко всем базам на время запроса."""
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(wrapper))
+    return stack
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # Последняя корзина — +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+def outbox_gauges():
+    stats = EmailOutbox.objects.stats(settings.EMAIL_OUTBOX_MAX_ATTEMPTS)
+    return {f'email_outbox_{name}': value for name, value in stats.items()}
+
+
+class Registry:
+    """Гистограммы по представлениям в памяти процесса.
+
+    Gauge не хранятся: их при каждом опросе возвращают функции из
+    `collectors`, так значения общие для всех процессов.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.statuses = {}
+        self.collectors = []
+
+    def observe(self, view, status_code, values):
+        with self.lock:
+            self.statuses[view, status_code] = (
+                self.statuses.get((view, status_code), 0) + 1
+            )
+            for name, value in values.items():
+                self._observe(name, view, value)
+
+    def observe_value(self, name, value, view=''):
+        with self.lock:
+            self._observe(name, view, value)
+
+    def _observe(self, name, view, value):
+        histogram = self.histograms.get((name, view))
+        if histogram is None:
+            histogram = self.histograms[name, view] = Histogram(
+                HISTOGRAMS[name][1]
+            )
+        histogram.observe(value)
+
+    def register_collector(self, collector):
+        if collector not in self.collectors:
+            self.collectors.append(collector)
+
+    def clear(self):
+        with self.lock:
+            self.histograms.clear()
+            self.statuses.clear()
+
+    def render(self):
+        """Текстовый формат Prometheus."""
+        with self.lock:
+            histograms = {
+                key: (histogram.counts[:], histogram.sum)
+                for key, histogram in self.histograms.items()
+            }
+            statuses = dict(self.statuses)
+        gauges = {}
+        for collector in self.collectors:
+            gauges.update(collector())
+        lines = [
+            '# HELP api_requests_total Число обработанных запросов',
+            '# TYPE api_requests_total counter',
+        ]
+        for (view, status_code), count in sorted(statuses.items()):
+            lines.append(
+                f'api_requests_total{{view="{view}",status="{status_code}"}} '
+                f'{count}'
+            )
+        for name, (description, buckets) in HISTOGRAMS.items():
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} histogram')
+            for (metric, view), (counts, total) in sorted(
+                histograms.items()
+            ):
+                if metric != name:
+                    continue
+                # Гистограммы не представлений (view='') — без метки
+                view_label = f'view="{view}",' if view else ''
+                labels = f'{{view="{view}"}}' if view else ''
+                cumulative = 0
+                for bound, count in zip((*buckets, '+Inf'), counts):
+                    cumulative += count
+                    lines.append(
+                        f'{name}_bucket{{{view_label}le="{bound}"}} '
+                        f'{cumulative}'
+                    )
+                lines.append(f'{name}_sum{labels} {total}')
+                lines.append(f'{name}_count{labels} {cumulative}')
+        for name, description in GAUGES.items():
+            if name not in gauges:
+                continue
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} gauge')
+            lines.append(f'{name} {gauges[name]}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', PROMETHEUS_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(port):
+    """Метрики процесса без Django-сервера, например у sendemails.
+
+    Запросы обслуживаются по одному в фоновом потоке.
+    """
+    server = HTTPServer(('', port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def get_view_name(view_func, method):
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return getattr(view_func, '__name__', type(view_func).__name__)
+    actions = getattr(view_func, 'actions', None) or {}
+    action = actions.get(method.lower())
+    if action is None:
+        return view_class.__name__
+    return f'{view_class.__name__}.{action}'
+
+
+@contextmanager
+def measure_serialization():
+    """Учитывает время сериализации ответа; вложенные вызовы — один раз."""
+    metrics = request_metrics.get()
+    if metrics is None or metrics.serializing:
+        yield
+        return
+    metrics.serializing = True
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_time += time.perf_counter() - started
+        metrics.serializing = False
+
+
+class MeasuredSerializerMixin:
+    """Время to_representation попадает в метрики запроса.
+
+    У списков (many=True) считается каждый объект, вложенные
+    сериализаторы второй раз не учитываются.
+    """
+
+    def to_representation(self, instance):
+        with measure_serialization():
+            return super().to_representation(instance)
@@ -0,0 +1,137 @@
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.settings import api_settings
+
+from .authentication import ClaimsJWTAuthentication
+from .metrics import (RequestMetrics, get_view_name, registry,
+                      request_metrics, track_queries)
+from .querylog import QueryInspector
+from .routers import RoutingState, routing_state
+
+
+def get_token_user_id(request):
+    authentication = ClaimsJWTAuthentication()
+    try:
+        header = authentication.get_header(request)
+        raw_token = header and authentication.get_raw_token(header)
+        if not raw_token:
+            return None
+        validated_token = authentication.get_validated_token(raw_token)
+        return validated_token[api_settings.USER_ID_CLAIM]
+    except (AuthenticationFailed, KeyError):
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Чтение безопасных запросов к API с реплик, запись в основную базу.
+
+    Пользователь, записавший что-то в базу, следующие
+    DATABASE_REPLICA_STICKY_SECONDS секунд читает из основной базы.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RoutingState(
+            read_only=False,
+            get_user_id=partial(get_token_user_id, request)
+        )
+        token = routing_state.set(state)
+        try:
+            response = self.get_response(request)
+            state.pin()
+        finally:
+            routing_state.reset(token)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = routing_state.get()
+        if state is not None:
+            state.read_only = (
+                request.method in SAFE_METHODS
+                and request.resolver_match.namespace == 'api'
+            )
+
+
+class MetricsMiddleware:
+    """Время запроса, запросы к базе, сериализация и размер ответа.
+
+    Считается для представлений API с разбивкой по действию
+    (`TitleViewSet.list`); при API_SERVER_TIMING значения
+    попадают в заголовок Server-Timing.
+    """
+
+    def __init__(self, get_response):
+        if not settings.API_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = request_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            with track_queries(connections, metrics):
+                response = self.get_response(request)
+        finally:
+            request_metrics.reset(token)
+        duration = time.perf_counter() - started
+        if metrics.view is None:
+            return response
+        values = {
+            'api_request_duration_seconds': duration,
+            'api_db_queries': metrics.queries,
+            'api_db_duration_seconds': metrics.db_time,
+            'api_serializer_duration_seconds': metrics.serializer_time,
+        }
+        if not response.streaming:
+            values['api_response_size_bytes'] = len(response.content)
+        registry.observe(metrics.view, response.status_code, values)
+        if settings.API_SERVER_TIMING:
+            response['Server-Timing'] = ', '.join((
+                'db;dur={:.2f};desc="{} queries"'.format(
+                    metrics.db_time * 1000, metrics.queries
+                ),
+                f'serializer;dur={metrics.serializer_time * 1000:.2f}',
+                f'total;dur={duration * 1000:.2f}',
+            ))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = request_metrics.get()
+        if metrics is not None and request.resolver_match.namespace == 'api':
+            metrics.view = get_view_name(view_func, request.method)
+
+
+class QueryInspectorMiddleware:
+    """Отладочный режим: медленные запросы и вероятные N+1 по запросу.
+
+    API_QUERY_INSPECTOR=log пишет их в логгер `api.queries`,
+    API_QUERY_INSPECTOR=raise завершает запрос ошибкой (для тестов).
+    """
+
+    def __init__(self, get_response):
+        if settings.API_QUERY_INSPECTOR not in ('log', 'raise'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        inspector = request.query_inspector = QueryInspector()
+        with track_queries(connections, inspector):
+            response = self.get_response(request)
+        inspector.report(
+            raise_error=settings.API_QUERY_INSPECTOR == 'raise'
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_inspector.view = get_view_name(
+            view_func, request.method
+        )
@@ -0,0 +1,214 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def positive_int(value, cutoff=None):
+    """Целое больше нуля, не больше `cutoff`; иначе ValueError."""
+    number = int(value)
+    if number <= 0:
+        raise ValueError('Ожидается целое число больше нуля.')
+    if cutoff:
+        return min(number, cutoff)
+    return number
+
+
+def get_ordering_columns(paginator):
+    """Колонки позиции курсора: их нужно читать, даже если их не выводят."""
+    return [
+        field.lstrip('-') for field in getattr(paginator, 'ordering', ())
+    ]
+
+
+class KeysetPagination(PageNumberPagination):
+    """Страницы по номеру, а с параметром `cursor` — по ключу.
+
+    `?cursor=` (пустой) открывает первую страницу по ключу, ссылки
+    `next` и `previous` передают курсор дальше. Такие страницы
+    фильтруются по последним значениям `ordering` вместо OFFSET
+    и не выполняют COUNT(*).
+
+    Размер страницы клиент задаёт в `page_size` или `limit`, не больше
+    `max_page_size` представления; `?count=false` пропускает COUNT(*)
+    и на страницах по номеру, оставляя только ссылки `next`/`previous`.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    limit_query_param = 'limit'
+    count_query_param = 'count'
+    max_page_size = settings.API_MAX_PAGE_SIZE
+    ordering = ('id',)
+    invalid_cursor_message = 'Неверный курсор'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.max_page_size = getattr(
+            view, 'max_page_size', None
+        ) or self.max_page_size
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        self.count_mode = request.query_params.get(
+            self.count_query_param
+        ) not in ('0', 'false')
+        if not self.cursor_mode:
+            if self.count_mode:
+                return super().paginate_queryset(queryset, request, view)
+            return self.paginate_without_count(queryset, request)
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        reverse, position = self.decode_cursor(request, queryset.model)
+
+        ordering = [
+            (field.lstrip('-'), field.startswith('-') != reverse)
+            for field in self.ordering
+        ]
+        queryset = queryset.order_by(*(
+            f'-{name}' if descending else name
+            for name, descending in ordering
+        ))
+        if position is not None:
+            queryset = queryset.filter(
+                self.position_filter(ordering, position)
+            )
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+
+        self.next_position = self.previous_position = None
+        if results:
+            if has_more or reverse:
+                self.next_position = self.get_position(results[-1])
+            if has_more and reverse or not reverse and position is not None:
+                self.previous_position = self.get_position(results[0])
+        elif position is not None:
+            # За курсором ничего нет: возвращаем ссылку к его позиции
+            self.previous_position = position if not reverse else None
+            self.next_position = position if reverse else None
+        return results
+
+    def get_page_size(self, request):
+        for param in (self.page_size_query_param, self.limit_query_param):
+            if param in request.query_params:
+                try:
+                    return positive_int(
+                        request.query_params[param], self.max_page_size
+                    )
+                except ValueError:
+                    pass
+        return self.page_size
+
+    def paginate_without_count(self, queryset, request):
+        """Страница по номеру без COUNT(*): читаем на одну строку больше."""
+        self.request = request
+        page_size = self.get_page_size(request)
+        page_number = request.query_params.get(self.page_query_param, 1)
+        try:
+            self.page_number = positive_int(page_number)
+        except ValueError as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            ))
+        offset = (self.page_number - 1) * page_size
+        results = list(queryset[offset:offset + page_size + 1])
+        if not results and self.page_number > 1:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message='Пустая страница'
+            ))
+        self.has_next = len(results) > page_size
+        return results[:page_size]
+
+    def get_paginated_response(self, data):
+        if self.cursor_mode:
+            return Response(OrderedDict([
+                ('next', self.get_cursor_link(self.next_position, False)),
+                ('previous',
+                 self.get_cursor_link(self.previous_position, True)),
+                ('results', data),
+            ]))
+        if not self.count_mode:
+            return Response(OrderedDict([
+                ('next', self.get_number_link(self.page_number + 1)
+                 if self.has_next else None),
+                ('previous', self.get_number_link(self.page_number - 1)),
+                ('results', data),
+            ]))
+        return super().get_paginated_response(data)
+
+    def get_number_link(self, page_number):
+        if page_number < 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if page_number == 1:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, page_number)
+
+    def get_position(self, obj):
+        if isinstance(obj, dict):
+            return [obj[field.lstrip('-')] for field in self.ordering]
+        return [getattr(obj, field.lstrip('-')) for field in self.ordering]
+
+    def position_filter(self, ordering, position):
+        conditions = []
+        for index, (name, descending) in enumerate(ordering):
+            lookup = 'lt' if descending else 'gt'
+            equal = {
+                previous_name: position[number]
+                for number, (previous_name, _) in enumerate(ordering[:index])
+            }
+            conditions.append(
+                Q(**equal, **{f'{name}__{lookup}': position[index]})
+            )
+        return reduce(or_, conditions)
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return False, None
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            reverse = bool(cursor['r'])
+            values = cursor['p']
+            if len(values) != len(self.ordering):
+                raise ValueError
+            position = [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, position
+
+    def get_cursor_link(self, position, reverse):
+        if position is None:
+            return None
+        cursor = json.dumps({
+            'r': reverse,
+            'p': [
+                value.isoformat() if hasattr(value, 'isoformat') else value
+                for value in position
+            ],
+        }, separators=(',', ':'))
+        url = remove_query_param(self.base_url, self.page_query_param)
+        return replace_query_param(
+            url,
+            self.cursor_query_param,
+            urlsafe_b64encode(cursor.encode('ascii')).decode('ascii')
+        )
+
+
+class TitlePagination(KeysetPagination):
+    ordering = ('id',)
+
+
+class PubDatePagination(KeysetPagination):
+    ordering = ('-pub_date', '-id')
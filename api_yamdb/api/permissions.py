@@ -28,6 +28,6 @@ class ReadAnyoneChangeIfIsOwnerAdminModerator(BasePermission):
         if request.method in SAFE_METHODS:
             return True
         return (
-            obj.author == request.user
+            obj.author_id == request.user.id
             or request.user.is_admin
             or request.user.is_moderator)
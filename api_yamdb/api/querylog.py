@@ -0,0 +1,131 @@
+import logging
+import os
+import re
+import sys
+import sysconfig
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger('api.queries')
+
+LIBRARY_PATHS = tuple({
+    sysconfig.get_paths()[name] for name in ('stdlib', 'purelib', 'platlib')
+})
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+# Служебные модули, которые сами вызывают запросы из middleware
+SKIPPED_FILES = {
+    os.path.join(API_DIR, name)
+    for name in ('querylog.py', 'metrics.py', 'middleware.py')
+}
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s")
+PLACEHOLDER_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+SPACES = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """Форма запроса: значения и списки IN (...) заменены заглушками."""
+    sql = LITERALS.sub('?', sql)
+    sql = PLACEHOLDER_LISTS.sub('(...)', sql)
+    return SPACES.sub(' ', sql).strip()
+
+
+def find_origin():
+    """Ближайший к запросу кадр кода проекта (api/, reviews/, тесты)."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not (
+            filename.startswith(LIBRARY_PATHS)
+            or filename.startswith('<')
+            or filename in SKIPPED_FILES
+        ):
+            return '{}:{} in {}'.format(
+                os.path.relpath(filename, settings.BASE_DIR),
+                frame.f_lineno,
+                frame.f_code.co_name
+            )
+        frame = frame.f_back
+    return None
+
+
+class DuplicateQueriesError(AssertionError):
+    pass
+
+
+class QueryShape:
+    __slots__ = ('sql', 'count', 'duration', 'origin')
+
+    def __init__(self, sql, origin):
+        self.sql = sql
+        self.count = 0
+        self.duration = 0.0
+        self.origin = origin
+
+    def __str__(self):
+        return '{} раз, {:.1f} мс, {}: {}'.format(
+            self.count, self.duration * 1000, self.origin or '?', self.sql
+        )
+
+
+class QueryInspector:
+    """execute_wrapper: группирует запросы по форме и ищет медленные.
+
+    Повторение одного SELECT не меньше `threshold` раз за запрос —
+    вероятный N+1; место вызова берётся из первого такого запроса.
+    """
+
+    def __init__(self, view=None, slow_ms=None, threshold=None):
+        self.view = view
+        self.slow_ms = (
+            settings.API_SLOW_QUERY_MS if slow_ms is None else slow_ms
+        )
+        self.threshold = (
+            settings.API_DUPLICATE_QUERIES if threshold is None
+            else threshold
+        )
+        self.shapes = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.record(sql, duration)
+
+    def record(self, sql, duration):
+        shape_sql = normalize_sql(sql)
+        shape = self.shapes.get(shape_sql)
+        if shape is None:
+            shape = self.shapes[shape_sql] = QueryShape(
+                shape_sql, find_origin()
+            )
+        shape.count += 1
+        shape.duration += duration
+        if duration * 1000 >= self.slow_ms:
+            logger.warning(
+                'Медленный запрос %.1f мс в %s (%s): %s',
+                duration * 1000, self.view or '?',
+                find_origin() or '?', sql
+            )
+
+    def duplicates(self):
+        return [
+            shape for shape in self.shapes.values()
+            if shape.count >= self.threshold
+            and shape.sql.lstrip('( ').upper().startswith('SELECT')
+        ]
+
+    def report(self, raise_error=False):
+        duplicates = self.duplicates()
+        if not duplicates:
+            return
+        message = 'Вероятный N+1 в {}:\n{}'.format(
+            self.view or '?',
+            '\n'.join(f'  {shape}' for shape in duplicates)
+        )
+        if raise_error:
+            raise DuplicateQueriesError(message)
+        logger.warning(message)
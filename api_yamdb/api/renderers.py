@@ -0,0 +1,92 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Строки с U+2028/U+2029 экранируются, как в JSONRenderer
+LINE_SEPARATORS = (
+    ('\u2028'.encode(), b'\\u2028'),
+    ('\u2029'.encode(), b'\\u2029'),
+)
+
+
+class OrjsonBackend:
+    # Даты и время отдаются JSONEncoder из DRF: формат совпадает
+    # с обычным рендерером (миллисекунды, Z для UTC)
+    options = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if orjson is not None else 0
+    )
+
+    def __init__(self):
+        self.default = JSONEncoder().default
+
+    def dumps(self, data):
+        return orjson.dumps(data, default=self.default, option=self.options)
+
+    def loads(self, content):
+        return orjson.loads(content)
+
+
+JSON_BACKENDS = {
+    'orjson': OrjsonBackend if orjson is not None else None,
+}
+json_backends = {}
+
+
+def get_json_backend():
+    """Быстрый кодировщик из API_JSON_BACKEND или None для stdlib json."""
+    name = settings.API_JSON_BACKEND
+    if name == 'auto':
+        name = next(
+            (name for name, backend in JSON_BACKENDS.items() if backend),
+            'json'
+        )
+    if name not in json_backends:
+        backend_class = JSON_BACKENDS.get(name)
+        json_backends[name] = backend_class and backend_class()
+    return json_backends[name]
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer с кодировщиком из get_json_backend().
+
+    Отступы (`Accept: application/json; indent=4`, Browsable API)
+    и отсутствие быстрого кодировщика обслуживает обычный рендерер.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        backend = get_json_backend()
+        if backend is None or data is None or self.get_indent(
+            accepted_media_type, renderer_context or {}
+        ) is not None:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        content = backend.dumps(data)
+        for separator, escaped in LINE_SEPARATORS:
+            if separator in content:
+                content = content.replace(separator, escaped)
+        return content
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        backend = get_json_backend()
+        encoding = (parser_context or {}).get(
+            'encoding', settings.DEFAULT_CHARSET
+        )
+        if backend is None or encoding.lower() not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return backend.loads(stream.read())
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,99 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_KEY = 'replica-pin:{}'
+# Модели, чтение которых с отстающей реплики небезопасно (аутентификация)
+PRIMARY_APPS = ('users', 'auth', 'contenttypes', 'sessions')
+
+routing_state = ContextVar('routing_state', default=None)
+
+
+class RoutingState:
+    """Состояние маршрутизации одного запроса к API.
+
+    Реплики используются только для безопасных запросов, пока в запросе
+    ничего не записано и пользователь не закреплён за основной базой
+    после своей недавней записи.
+    """
+
+    def __init__(self, read_only, get_user_id):
+        self.read_only = read_only
+        self.primary = False
+        self.wrote = False
+        self.get_user_id = get_user_id
+        self._pinned = None
+
+    @property
+    def user_id(self):
+        if not hasattr(self, '_user_id'):
+            self._user_id = self.get_user_id()
+        return self._user_id
+
+    def pinned(self):
+        if self._pinned is None:
+            self._pinned = (
+                self.user_id is not None
+                and cache.get(PIN_KEY.format(self.user_id)) is not None
+            )
+        return self._pinned
+
+    def use_replica(self):
+        return (
+            self.read_only
+            and not self.primary
+            and not self.wrote
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+            and not self.pinned()
+        )
+
+    def pin(self):
+        if self.wrote and self.user_id is not None:
+            cache.set(
+                PIN_KEY.format(self.user_id),
+                True,
+                settings.DATABASE_REPLICA_STICKY_SECONDS
+            )
+
+
+@contextmanager
+def use_primary():
+    state = routing_state.get()
+    if state is None:
+        yield
+        return
+    previous, state.primary = state.primary, True
+    try:
+        yield
+    finally:
+        state.primary = previous
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not settings.DATABASE_REPLICAS:
+            return None
+        if model._meta.app_label in PRIMARY_APPS:
+            return None
+        state = routing_state.get()
+        if state is None or not state.use_replica():
+            return None
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        state = routing_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
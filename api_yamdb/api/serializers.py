@@ -1,13 +1,17 @@
 import uuid
 
 from django.conf import settings
+from django.utils.encoding import smart_str
 from rest_framework import serializers
 
 from reviews.models import Category, Comment, Genre, Review, Title
 from users.models import ROLES, User
+from .metrics import MeasuredSerializerMixin
+from .sparse import SparseFieldsSerializerMixin
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(MeasuredSerializerMixin, SparseFieldsSerializerMixin,
+                     serializers.ModelSerializer):
     role = serializers.ChoiceField(choices=ROLES, default='user')
 
     class Meta:
@@ -41,7 +45,7 @@ class MeSerializer(UserSerializer):
     role = serializers.CharField(read_only=True)
 
 
-class SignUpSerializer(serializers.Serializer):
+class SignUpSerializer(MeasuredSerializerMixin, serializers.Serializer):
     email = serializers.EmailField(max_length=254, required=True)
     username = serializers.CharField(max_length=150)
 
@@ -53,24 +57,53 @@ class SignUpSerializer(serializers.Serializer):
         return name
 
 
-class AuthSerializer(serializers.Serializer):
+class AuthSerializer(MeasuredSerializerMixin, serializers.Serializer):
     username = serializers.CharField(max_length=150)
     confirmation_code = serializers.CharField(max_length=255)
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class PreloadedSlugRelatedField(serializers.SlugRelatedField):
+    """Берёт объекты из `context['preloaded']`, если они загружены заранее."""
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get('preloaded', {}).get(self.queryset.model)
+        if preloaded is None:
+            return super().to_internal_value(data)
+        if not isinstance(data, (str, int)):
+            self.fail('invalid')
+        try:
+            return preloaded[smart_str(data)]
+        except KeyError:
+            self.fail(
+                'does_not_exist',
+                slug_name=self.slug_field,
+                value=smart_str(data)
+            )
+
+
+class CategorySerializer(MeasuredSerializerMixin, serializers.ModelSerializer):
     class Meta:
         fields = ('name', 'slug')
         model = Category
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class CategoryBulkSerializer(CategorySerializer):
+    class Meta(CategorySerializer.Meta):
+        extra_kwargs = {'slug': {'validators': []}}
+
+
+class GenreSerializer(MeasuredSerializerMixin, serializers.ModelSerializer):
     class Meta:
         fields = ('name', 'slug')
         model = Genre
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class GenreBulkSerializer(GenreSerializer):
+    class Meta(GenreSerializer.Meta):
+        extra_kwargs = {'slug': {'validators': []}}
+
+
+class TitleSerializer(MeasuredSerializerMixin, serializers.ModelSerializer):
     genre = GenreSerializer(read_only=True, many=True)
     category = CategorySerializer(read_only=True)
 
@@ -86,10 +119,14 @@ class TitleSerializer(serializers.ModelSerializer):
         model = Title
 
 
-class TitleSerializerRead(serializers.ModelSerializer):
+class TitleSerializerRead(MeasuredSerializerMixin,
+                          SparseFieldsSerializerMixin,
+                          serializers.ModelSerializer):
     genre = GenreSerializer(read_only=True, many=True)
     category = CategorySerializer(read_only=True)
     rating = serializers.IntegerField()
+    review_count = serializers.IntegerField(source='rating_count')
+    scores = serializers.DictField(child=serializers.IntegerField())
 
     class Meta:
         fields = (
@@ -99,18 +136,28 @@ class TitleSerializerRead(serializers.ModelSerializer):
             'rating',
             'description',
             'category',
-            'genre'
+            'genre',
+            'review_count',
+            'scores'
         )
         model = Title
         read_only_fields = fields
+        expandable_fields = ('review_count', 'scores')
+
+    def get_expanded_fields(self):
+        expanded = super().get_expanded_fields()
+        if self.context.get('with_stats'):
+            expanded.update(self.Meta.expandable_fields)
+        return expanded
 
 
-class TitleSerializerWrite(serializers.ModelSerializer):
-    category = serializers.SlugRelatedField(
+class TitleSerializerWrite(MeasuredSerializerMixin,
+                           serializers.ModelSerializer):
+    category = PreloadedSlugRelatedField(
         queryset=Category.objects.all(),
         slug_field='slug'
     )
-    genre = serializers.SlugRelatedField(
+    genre = PreloadedSlugRelatedField(
         queryset=Genre.objects.all(),
         slug_field='slug',
         many=True
@@ -125,7 +172,9 @@ class TitleSerializerWrite(serializers.ModelSerializer):
         return serializer.data
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(MeasuredSerializerMixin,
+                       SparseFieldsSerializerMixin,
+                       serializers.ModelSerializer):
     id = serializers.PrimaryKeyRelatedField(
         queryset=Review.objects.all(),
         default=None
@@ -153,7 +202,9 @@ class ReviewSerializer(serializers.ModelSerializer):
         return data
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(MeasuredSerializerMixin,
+                        SparseFieldsSerializerMixin,
+                        serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True,
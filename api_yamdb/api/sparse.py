@@ -0,0 +1,140 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+from .compiled import PROPERTY_COLUMNS
+from .pagination import get_ordering_columns
+
+SPARSE_PARAMS = ('fields', 'omit', 'expand')
+
+
+def parse_names(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class SparseFieldsSerializerMixin:
+    """Поля ответа по `fields`, `omit` и `expand` из контекста.
+
+    Поля из `Meta.expandable_fields` отдаются, только если названы
+    в `expand` или `fields`.
+    """
+
+    def get_expanded_fields(self):
+        return set(self.context.get('expand', ()))
+
+    def get_fields(self):
+        fields = super().get_fields()
+        only = self.context.get('fields')
+        omit = self.context.get('omit', ())
+        expandable = getattr(self.Meta, 'expandable_fields', ())
+        errors = {}
+        for param, names, known in (
+            ('fields', only or (), fields),
+            ('omit', omit, fields),
+            ('expand', self.context.get('expand', ()), expandable),
+        ):
+            unknown = sorted(set(names) - set(known))
+            if unknown:
+                errors[param] = [f'Неизвестные поля: {", ".join(unknown)}']
+        if errors:
+            raise serializers.ValidationError(errors)
+        if only is not None:
+            keep = set(only)
+        else:
+            keep = set(fields) - (
+                set(expandable) - self.get_expanded_fields()
+            )
+        for name in list(fields):
+            if name not in keep or name in omit:
+                fields.pop(name)
+        return fields
+
+
+def get_loads(serializer):
+    """Колонки для only(), связи для select_related и prefetch_related.
+
+    None, если какое-то поле не сводится к полю модели.
+    """
+    model = serializer.Meta.model
+    columns = []
+    select = []
+    prefetch = []
+    for field in serializer.fields.values():
+        source = field.source
+        if source == '*' or '.' in source:
+            return None
+        if (model, source) in PROPERTY_COLUMNS:
+            columns.extend(PROPERTY_COLUMNS[model, source][0])
+            continue
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            return None
+        if model_field.many_to_many or model_field.one_to_many:
+            prefetch.append(source)
+            continue
+        columns.append(source)
+        if isinstance(field, serializers.SlugRelatedField):
+            select.append(source)
+            columns.append(f'{source}__{field.slug_field}')
+        elif isinstance(field, serializers.BaseSerializer):
+            select.append(source)
+            columns.extend(
+                f'{source}__{nested.source}'
+                for nested in field.fields.values()
+            )
+    return columns, select, prefetch
+
+
+def prune_queryset(queryset, serializer, extra=()):
+    """Загружает только колонки и связи, нужные полям сериализатора.
+
+    `extra` — колонки, нужные не полям, а представлению (пагинации).
+    """
+    loads = get_loads(serializer)
+    if loads is None:
+        return queryset
+    columns, select, prefetch = loads
+    columns.extend(extra)
+    lookups = [
+        lookup for lookup in queryset._prefetch_related_lookups
+        if (
+            lookup.prefetch_to if isinstance(lookup, Prefetch) else lookup
+        ).split('__')[0] in prefetch
+    ]
+    return queryset.select_related(None).select_related(
+        *select
+    ).prefetch_related(None).prefetch_related(*lookups).only(*columns)
+
+
+class SparseFieldsMixin:
+    """`?fields=`, `?omit=` и `?expand=` для чтения.
+
+    Сериализатор с SparseFieldsSerializerMixin отдаёт только выбранные
+    поля, а запрос к базе читает только их колонки и связи.
+    """
+
+    def get_sparse_params(self):
+        request = getattr(self, 'request', None)
+        if request is None or request.method not in ('GET', 'HEAD'):
+            return {}
+        return {
+            param: parse_names(request.query_params[param])
+            for param in SPARSE_PARAMS if param in request.query_params
+        }
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context.update(self.get_sparse_params())
+        return context
+
+    def filter_queryset(self, queryset):
+        # list и get_object получают запрос только отсюда, а get_queryset
+        # переопределяют сами представления
+        queryset = super().filter_queryset(queryset)
+        if not self.get_sparse_params():
+            return queryset
+        return prune_queryset(
+            queryset, self.get_serializer(),
+            get_ordering_columns(self.paginator)
+        )
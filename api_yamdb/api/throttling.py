@@ -0,0 +1,149 @@
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+THROTTLE_KEY = 'throttle:{}:{}'
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+class LocalBucketStore:
+    """Token bucket в памяти процесса.
+
+    Хранится одно число на ключ — момент, когда ведро снова станет полным
+    (алгоритм GCRA). Лимит действует на каждый процесс отдельно.
+    """
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self.lock = threading.Lock()
+        self.buckets = {}
+
+    def take(self, key, interval, period, now):
+        with self.lock:
+            full_at = max(self.buckets.get(key, now), now) + interval
+            if full_at - now > period:
+                return full_at - now - period
+            if len(self.buckets) >= self.max_keys:
+                self.buckets = {
+                    bucket: value for bucket, value in self.buckets.items()
+                    if value > now
+                }
+            self.buckets[key] = full_at
+            return 0
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class CacheBucketStore:
+    """Token bucket в общем кэше: лимит общий для всех процессов.
+
+    Чтение и запись не атомарны, поэтому при одновременных запросах
+    с одного ключа лимит может быть превышен на число процессов.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def take(self, key, interval, period, now):
+        cache = caches[self.alias]
+        full_at = max(cache.get(key, now), now) + interval
+        if full_at - now > period:
+            return full_at - now - period
+        cache.set(key, full_at, math.ceil(full_at - now))
+        return 0
+
+
+local_store = LocalBucketStore()
+
+
+def get_store():
+    if settings.API_THROTTLE_STORE == 'cache':
+        return CacheBucketStore(settings.API_THROTTLE_CACHE)
+    return local_store
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Ограничение `scope` из DEFAULT_THROTTLE_RATES, например '5/min'.
+
+    Ведро вмещает 5 запросов и пополняется на один каждые 12 секунд.
+    Без настроенного лимита запросы не ограничиваются. Ключ ведра —
+    IP клиента; подклассы выбирают другой ключ в get_key, None
+    означает запрос без ограничения.
+    """
+    scope = None
+    timer = time.time
+
+    def __init__(self):
+        self.rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        self.wait_time = None
+
+    def get_key(self, request, view):
+        return self.get_ident(request)
+
+    def allow_request(self, request, view):
+        if not self.rate:
+            return True
+        key = self.get_key(request, view)
+        if key is None:
+            return True
+        num_requests, period = parse_rate(self.rate)
+        self.wait_time = get_store().take(
+            THROTTLE_KEY.format(self.scope, key),
+            period / num_requests,
+            period,
+            self.timer()
+        )
+        return not self.wait_time
+
+    def wait(self):
+        return self.wait_time
+
+
+class UsernameThrottle(TokenBucketThrottle):
+    def get_key(self, request, view):
+        data = request.data
+        username = data.get('username') if hasattr(data, 'get') else None
+        if not isinstance(username, str) or not username:
+            return None
+        return username.lower()
+
+
+class SignUpIPThrottle(TokenBucketThrottle):
+    scope = 'signup_ip'
+
+
+class SignUpUsernameThrottle(UsernameThrottle):
+    scope = 'signup_username'
+
+
+class TokenIPThrottle(TokenBucketThrottle):
+    scope = 'token_ip'
+
+
+class TokenUsernameThrottle(UsernameThrottle):
+    scope = 'token_username'
+
+
+class WriteThrottle(TokenBucketThrottle):
+    """Общий лимит изменяющих запросов: по пользователю или по IP."""
+    scope = 'write'
+
+    def get_key(self, request, view):
+        if request.method in SAFE_METHODS:
+            return None
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.id}'
+        return self.get_ident(request)
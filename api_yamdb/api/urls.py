@@ -2,8 +2,8 @@ from django.urls import include, path
 from rest_framework import routers
 
 from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, TitleViewSet, UserViewSet, get_token,
-                    sign_up)
+                    ReviewViewSet, TitleViewSet, UserViewSet, export_data,
+                    get_metrics, get_token, sign_up)
 
 app_name = 'api'
 
@@ -26,4 +26,10 @@ urlpatterns = [
     path('v1/', include(router.urls)),
     path('v1/auth/signup/', sign_up, name='signup'),
     path('v1/auth/token/', get_token, name='gettoken'),
+    path(
+        'v1/export/<slug:dataset>.<slug:extension>',
+        export_data,
+        name='export'
+    ),
+    path('v1/metrics/', get_metrics, name='metrics'),
 ]
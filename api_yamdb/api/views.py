@@ -1,33 +1,48 @@
 import uuid
 
 from django.conf import settings
-from django.core.mail import send_mail
-from django.db import IntegrityError
-from django.db.models import Avg
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Max, Prefetch
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.encoding import smart_str
 from rest_framework import filters, mixins, status, viewsets
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import (action, api_view, permission_classes,
+                                       throttle_classes)
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 
-from reviews.models import Category, Genre, Review, Title
-from users.models import User
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import EmailOutbox, User
+from .authentication import ClaimsRefreshToken
+from .batch import BatchRetrieveMixin
+from .bulk import BulkModelMixin
+from .cache import CATALOG, CachedListMixin, CachedRetrieveMixin
+from .compiled import CompiledListMixin
+from .export import CONTENT_TYPES, EXPORTS, build_export, stream
 from .filters import TitleFilter
+from .metrics import PROMETHEUS_CONTENT_TYPE, registry
+from .pagination import PubDatePagination, TitlePagination
 from .permissions import (IsAdmin, IsAdminOrReadOnly,
                           ReadAnyoneChangeIfIsOwnerAdminModerator)
-from .serializers import (AuthSerializer, CategorySerializer,
-                          CommentSerializer, GenreSerializer, MeSerializer,
+from .serializers import (AuthSerializer, CategoryBulkSerializer,
+                          CategorySerializer, CommentSerializer,
+                          GenreBulkSerializer, GenreSerializer, MeSerializer,
                           ReviewSerializer, SignUpSerializer,
                           TitleSerializerRead, TitleSerializerWrite,
                           UserSerializer)
+from .sparse import SparseFieldsMixin
+from .throttling import (SignUpIPThrottle, SignUpUsernameThrottle,
+                         TokenIPThrottle, TokenUsernameThrottle)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(BatchRetrieveMixin, SparseFieldsMixin,
+                  viewsets.ModelViewSet):
     queryset = User.objects.all().order_by('id')
     serializer_class = UserSerializer
     permission_classes = (IsAdmin,)
     lookup_field = 'username'
+    batch_query_param = 'usernames'
     filter_backends = (filters.SearchFilter,)
     search_fields = ('username',)
 
@@ -48,31 +63,35 @@ class UserViewSet(viewsets.ModelViewSet):
 
 @api_view(['POST'])
 @permission_classes((AllowAny,))
+@throttle_classes((SignUpIPThrottle, SignUpUsernameThrottle))
 def sign_up(request):
     serializer = SignUpSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     email = serializer.validated_data['email']
     confirmation_code = str(uuid.uuid3(uuid.NAMESPACE_X500, email))
     try:
-        user, created = User.objects.get_or_create(
-            **serializer.validated_data,
-            confirmation_code=confirmation_code
-        )
+        with transaction.atomic():
+            user, created = User.objects.get_or_create(
+                **serializer.validated_data,
+                confirmation_code=confirmation_code
+            )
+            EmailOutbox.objects.create(
+                recipient=email,
+                subject=settings.DEFAULT_EMAIL_SUBJECT,
+                message=user.confirmation_code,
+                from_email=settings.DEFAULT_FROM_EMAIL
+            )
     except IntegrityError:
         return Response(
             'Такой логин или email уже существуют',
             status=status.HTTP_400_BAD_REQUEST
         )
-    send_mail(
-        subject=settings.DEFAULT_EMAIL_SUBJECT,
-        message=user.confirmation_code,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=(email,))
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
 @permission_classes((AllowAny,))
+@throttle_classes((TokenIPThrottle, TokenUsernameThrottle))
 def get_token(request):
     serializer = AuthSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
@@ -81,12 +100,44 @@ def get_token(request):
     user = get_object_or_404(User, username=username)
     if confirmation_code != user.confirmation_code:
         return Response(status=status.HTTP_400_BAD_REQUEST)
-    refresh = RefreshToken.for_user(user)
+    refresh = ClaimsRefreshToken.for_user(user)
     return Response({'token': str(refresh.access_token)},
                     status=status.HTTP_200_OK)
 
 
+@api_view(['GET'])
+@permission_classes((IsAdmin,))
+def export_data(request, dataset, extension):
+    if dataset not in EXPORTS or extension not in CONTENT_TYPES:
+        return Response(status=status.HTTP_404_NOT_FOUND)
+    try:
+        export = build_export(
+            dataset,
+            since=request.query_params.get('since'),
+            since_id=request.query_params.get('since_id'),
+            using=EXPORTS[dataset].model.objects.all().db
+        )
+    except ValueError as error:
+        return Response(str(error), status=status.HTTP_400_BAD_REQUEST)
+    response = StreamingHttpResponse(
+        stream(export, extension), content_type=CONTENT_TYPES[extension]
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{dataset}.{extension}"'
+    )
+    return response
+
+
+@api_view(['GET'])
+@permission_classes((IsAdmin,))
+def get_metrics(request):
+    return HttpResponse(
+        registry.render(), content_type=PROMETHEUS_CONTENT_TYPE
+    )
+
+
 class ListCreateDestroyViewSet(
+        BulkModelMixin,
         mixins.CreateModelMixin,
         mixins.DestroyModelMixin,
         mixins.ListModelMixin,
@@ -95,6 +146,8 @@ class ListCreateDestroyViewSet(
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    # Справочники короткие: их можно получить одной страницей
+    max_page_size = 1000
 
     def get_permissions(self):
         if self.action == 'list':
@@ -102,59 +155,200 @@ class ListCreateDestroyViewSet(
         return (IsAdmin(),)
 
 
-class CategoryViewSet(ListCreateDestroyViewSet):
+class CategoryViewSet(CachedListMixin, ListCreateDestroyViewSet):
     queryset = Category.objects.all().order_by('id')
     serializer_class = CategorySerializer
+    bulk_serializer_class = CategoryBulkSerializer
+    bulk_unique_fields = ('slug',)
+    cache_namespaces = ('categories',)
 
 
-class GenreViewSet(ListCreateDestroyViewSet):
+class GenreViewSet(CachedListMixin, ListCreateDestroyViewSet):
     queryset = Genre.objects.all().order_by('id')
     serializer_class = GenreSerializer
+    bulk_serializer_class = GenreBulkSerializer
+    bulk_unique_fields = ('slug',)
+    cache_namespaces = ('genres',)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')).all().order_by('id')
+class TitleViewSet(BulkModelMixin, CachedListMixin, CachedRetrieveMixin,
+                   BatchRetrieveMixin, CompiledListMixin, SparseFieldsMixin,
+                   viewsets.ModelViewSet):
+    queryset = Title.objects.select_related('category').prefetch_related(
+        # Тот же порядок жанров, что и в CompiledSerializer
+        Prefetch('genre', queryset=Genre.objects.order_by('id'))
+    ).order_by('id')
     filterset_class = TitleFilter
+    pagination_class = TitlePagination
+    bulk_lookup_field = 'id'
+    bulk_serializer_class = TitleSerializerWrite
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return TitleSerializerRead
         return TitleSerializerWrite
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['with_stats'] = (
+            self.request.query_params.get('stats') in ('1', 'true')
+        )
+        return context
+
+    def get_cache_namespaces(self):
+        if self.action == 'retrieve':
+            return (CATALOG, 'categories', 'genres',
+                    f'title:{self.kwargs.get("pk")}')
+        return (CATALOG, 'categories', 'genres', 'titles')
+
     def get_permissions(self):
         if self.action in ('list', 'retrieve'):
             return (AllowAny(),)
         return (IsAdmin(),)
 
+    def preload_related(self, items):
+        category_slugs = set()
+        genre_slugs = set()
+        for item in items:
+            if isinstance(item.get('category'), (str, int)):
+                category_slugs.add(smart_str(item['category']))
+            if isinstance(item.get('genre'), list):
+                genre_slugs.update(
+                    smart_str(slug) for slug in item['genre']
+                    if isinstance(slug, (str, int))
+                )
+        return {
+            Category: Category.objects.in_bulk(
+                category_slugs, field_name='slug'
+            ),
+            Genre: Genre.objects.in_bulk(genre_slugs, field_name='slug'),
+        }
 
-class ReviewViewSet(viewsets.ModelViewSet):
-    serializer_class = ReviewSerializer
+    def perform_bulk_create(self, validated):
+        titles = [
+            Title(**{
+                field: value for field, value in data.items()
+                if field != 'genre'
+            })
+            for data in validated
+        ]
+        if connection.features.can_return_ids_from_bulk_insert:
+            Title.objects.bulk_create(titles)
+        else:
+            # Без RETURNING ключи читаются после вставки: запись в базу
+            # заблокирована с начала транзакции (BEGIN IMMEDIATE), поэтому
+            # все id больше прежнего максимума — наши и идут по порядку
+            last_id = Title.objects.aggregate(last_id=Max('id'))['last_id']
+            Title.objects.bulk_create(titles)
+            ids = Title.objects.filter(id__gt=last_id or 0).order_by(
+                'id'
+            ).values_list('id', flat=True)
+            for title, title_id in zip(titles, ids):
+                title.id = title_id
+        self.set_genres(zip(titles, (data['genre'] for data in validated)))
+        return titles
+
+    def perform_bulk_update(self, pairs):
+        fields = set()
+        genres = []
+        for title, data in pairs:
+            for field, value in data.items():
+                if field == 'genre':
+                    genres.append((title, value))
+                    continue
+                setattr(title, field, value)
+                fields.add(field)
+        if fields:
+            Title.objects.bulk_update([title for title, _ in pairs], fields)
+        if genres:
+            Title.genre.through.objects.filter(
+                title_id__in=[title.id for title, _ in genres]
+            ).delete()
+            self.set_genres(genres)
+
+    def set_genres(self, pairs):
+        Title.genre.through.objects.bulk_create([
+            Title.genre.through(title_id=title.id, genre_id=genre.id)
+            for title, genres in pairs
+            for genre in {genre.id: genre for genre in genres}.values()
+        ])
+
+
+class NestedViewSet(BatchRetrieveMixin, CompiledListMixin, SparseFieldsMixin,
+                    viewsets.ModelViewSet):
+    """Вложенный ресурс: родители проверяются в том же запросе, что и объект.
+
+    Отдельный запрос к родителю нужен только при создании и на пустой
+    странице списка; найденный родитель сохраняется в `request.parent`.
+    Родитель — `parent_model` с полями из `parent_lookups`
+    (поле модели -> именованный аргумент URL).
+    """
     permission_classes = (ReadAnyoneChangeIfIsOwnerAdminModerator,)
+    pagination_class = PubDatePagination
+    parent_model = None
+    parent_lookups = {}
 
-    def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+    def resolve_parent(self):
+        return get_object_or_404(
+            self.parent_model.objects.only(*self.parent_lookups),
+            **{
+                field: self.kwargs.get(kwarg)
+                for field, kwarg in self.parent_lookups.items()
+            }
+        )
+
+    def get_parent(self):
+        if getattr(self.request, 'parent', None) is None:
+            self.request.parent = self.resolve_parent()
+        return self.request.parent
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page:
+            self.get_parent()
+        return page
+
+    def fetch_batch(self, queryset, values):
+        found = super().fetch_batch(queryset, values)
+        if not found:
+            self.get_parent()
+        return found
+
+
+class ReviewViewSet(NestedViewSet):
+    serializer_class = ReviewSerializer
+    parent_model = Title
+    parent_lookups = {'id': 'title_id'}
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        return Review.objects.filter(
+            title_id=self.kwargs.get('title_id')
+        ).select_related('author')
+
+    # Рейтинг произведения правят сигналы Review в той же транзакции
+    @transaction.atomic
+    def perform_create(self, serializer):
+        serializer.save(author=self.request.user, title=self.get_parent())
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(NestedViewSet):
     serializer_class = CommentSerializer
-    permission_classes = (ReadAnyoneChangeIfIsOwnerAdminModerator,)
+    parent_model = Review
+    parent_lookups = {'id': 'review_id', 'title_id': 'title_id'}
 
-    def get_queryset(self, *args, **kwargs):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        try:
-            review = title.reviews.get(id=self.kwargs.get('review_id'))
-        except TypeError:
-            raise TypeError('У произведения нет такого отзыва')
-        return review.comments.all()
+    def get_queryset(self):
+        return Comment.objects.filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id')
+        ).select_related('author')
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review, pk=self.kwargs.get('review_id'))
-        if str(review.title.id) != self.kwargs.get('title_id'):
-            raise ValueError('Некорректный title')
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_parent())
@@ -0,0 +1,33 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite с дополнительными ключами OPTIONS.
+
+    `init_command` — PRAGMA через `;`, выполняются на каждом новом
+    соединении. `transaction_mode` — режим BEGIN: с DEFERRED писатель,
+    уже читавший в транзакции, получает «database is locked» сразу,
+    не дожидаясь `timeout`; IMMEDIATE берёт блокировку на запись в начале
+    транзакции и ждёт её.
+    """
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.init_commands = [
+            command.strip()
+            for command in params.pop('init_command', '').split(';')
+            if command.strip()
+        ]
+        self.transaction_mode = params.pop('transaction_mode', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for command in self.init_commands:
+            conn.execute(command)
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode is None:
+            return super()._start_transaction_under_autocommit()
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
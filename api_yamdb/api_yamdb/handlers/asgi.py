@@ -0,0 +1,173 @@
+import asyncio
+import contextvars
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.core import signals
+from django.core.handlers import base
+from django.core.handlers.wsgi import WSGIRequest, get_script_name
+from django.urls import set_script_prefix
+
+
+class ASGIHandler(base.BaseHandler):
+    """ASGI-приложение для Django 2.2, в котором своего ASGI ещё нет.
+
+    Тело запроса читается и ответ отправляется в цикле событий, а
+    представление с запросами к базе работает в пуле из ASGI_THREADS
+    потоков: медленный клиент не занимает поток, пока передаёт данные.
+    Потоковые ответы (выгрузки) отправляются из потока пула, потому что
+    их итератор читает курсор базы, открытый в этом потоке.
+    """
+    request_class = WSGIRequest
+
+    def __init__(self, threads=None):
+        super().__init__()
+        self.load_middleware()
+        self.executor = ThreadPoolExecutor(
+            max_workers=threads or settings.ASGI_THREADS,
+            thread_name_prefix='asgi'
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            raise ValueError(
+                f'Неподдерживаемый тип соединения {scope["type"]!r}'
+            )
+        body = await self.read_body(receive)
+        if body is None:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(
+                self.executor,
+                contextvars.copy_context().run,
+                self.handle,
+                self.get_environ(scope, body),
+                send,
+                loop
+            )
+        finally:
+            body.close()
+        if result is not None:
+            start, content = result
+            await send(start)
+            await send({'type': 'http.response.body', 'body': content})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self.executor.shutdown
+                )
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def read_body(self, receive):
+        body = tempfile.SpooledTemporaryFile(
+            max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE, mode='w+b'
+        )
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                return None
+            body.write(message.get('body', b''))
+            if not message.get('more_body', False):
+                break
+        body.seek(0)
+        return body
+
+    def get_environ(self, scope, body):
+        server = scope.get('server') or ('unknown', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', ''),
+            # Как в WSGI: байты пути в UTF-8, прочитанные как latin-1
+            'PATH_INFO': scope['path'].encode().decode('iso-8859-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode(
+                'iso-8859-1'
+            ),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        if scope.get('client'):
+            environ['REMOTE_ADDR'] = scope['client'][0]
+            environ['REMOTE_PORT'] = str(scope['client'][1])
+        for name, value in scope.get('headers', ()):
+            name = name.decode('iso-8859-1').upper().replace('-', '_')
+            value = value.decode('iso-8859-1')
+            if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                name = f'HTTP_{name}'
+            if name in environ:
+                value = f'{environ[name]},{value}'
+            environ[name] = value
+        # Тело уже прочитано целиком, даже если клиент не указал длину
+        environ.setdefault(
+            'CONTENT_LENGTH', str(body.seek(0, 2))
+        )
+        body.seek(0)
+        return environ
+
+    def handle(self, environ, send, loop):
+        """Обработка в потоке пула, как WSGIHandler.__call__."""
+        set_script_prefix(get_script_name(environ))
+        signals.request_started.send(sender=self.__class__, environ=environ)
+        request = self.request_class(environ)
+        response = self.get_response(request)
+        response._handler_class = self.__class__
+        start = {
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': [
+                (name.encode('iso-8859-1'), value.encode('iso-8859-1'))
+                for name, value in (
+                    *response.items(),
+                    *(
+                        ('Set-Cookie', cookie.output(header=''))
+                        for cookie in response.cookies.values()
+                    ),
+                )
+            ],
+        }
+        try:
+            if not response.streaming:
+                return start, response.content
+
+            def send_sync(message):
+                asyncio.run_coroutine_threadsafe(
+                    send(message), loop
+                ).result()
+
+            send_sync(start)
+            for chunk in response:
+                send_sync({
+                    'type': 'http.response.body',
+                    'body': chunk,
+                    'more_body': True,
+                })
+            send_sync({'type': 'http.response.body', 'body': b''})
+            return None
+        finally:
+            # request_finished закрывает соединения с базой этого потока
+            response.close()
+
+
+def get_asgi_application():
+    django.setup(set_prefix=False)
+    return ASGIHandler()
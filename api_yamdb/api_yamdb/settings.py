@@ -30,11 +30,13 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
     'django_filters',
     'users',
-    'api',
+    'api.apps.ApiConfig',
     'reviews',
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.QueryInspectorMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -42,6 +44,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -64,15 +67,79 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
+# api_yamdb.asgi: представления и запросы к базе выполняются в пуле потоков,
+# медленные клиенты обслуживаются циклом событий без занятого потока
+ASGI_THREADS = int(os.environ.get('ASGI_THREADS', 16))
 
 # Database
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+# PostgreSQL при DB_ENGINE=django.db.backends.postgresql, иначе SQLite,
+# настроенный на параллельную запись. Соединения живут DB_CONN_MAX_AGE
+# секунд; при DB_POOLER=pgbouncer пул держит PgBouncer в режиме transaction
+DB_ENGINE = os.environ.get('DB_ENGINE', 'django.db.backends.sqlite3')
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+
+if DB_ENGINE == 'django.db.backends.postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINE,
+            'NAME': os.environ.get('DB_NAME', 'postgres'),
+            'USER': os.environ.get('POSTGRES_USER', 'postgres'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'DISABLE_SERVER_SIDE_CURSORS': (
+                os.environ.get('DB_POOLER') == 'pgbouncer'
+            ),
+            'OPTIONS': {
+                'connect_timeout': int(
+                    os.environ.get('DB_CONNECT_TIMEOUT', 5)
+                ),
+            },
+        }
     }
-}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'api_yamdb.backends.sqlite3',
+            'NAME': os.environ.get(
+                'DB_NAME', os.path.join(BASE_DIR, 'db.sqlite3')
+            ),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'OPTIONS': {
+                'timeout': float(os.environ.get('SQLITE_BUSY_TIMEOUT', 20)),
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': ';'.join((
+                    'PRAGMA journal_mode=WAL',
+                    'PRAGMA synchronous={}'.format(
+                        os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+                    ),
+                    'PRAGMA mmap_size={}'.format(
+                        os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)
+                    ),
+                )),
+            },
+        }
+    }
+
+# Реплики PostgreSQL для чтения: DB_REPLICA_HOSTS=host1,host2:5433
+DATABASE_REPLICAS = []
+for number, address in enumerate(
+    filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(','))
+):
+    host, _, port = address.strip().partition(':')
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default'].get('PORT', ''),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+DATABASE_REPLICA_STICKY_SECONDS = int(
+    os.environ.get('DB_REPLICA_STICKY_SECONDS', 5)
+)
 
 # Password validation
 
@@ -112,16 +179,86 @@ STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static/'),)
 AUTH_USER_MODEL = 'users.User'
 
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetPagination',
     'PAGE_SIZE': 5,
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
+    ],
+    'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
-    'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend']
+    # Число прокси перед приложением: X-Forwarded-For учитывается только
+    # от них, иначе адрес клиента берётся из REMOTE_ADDR
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.WriteThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'signup_ip': os.environ.get('THROTTLE_SIGNUP_IP', '20/min'),
+        'signup_username': os.environ.get('THROTTLE_SIGNUP_USERNAME', '5/min'),
+        'token_ip': os.environ.get('THROTTLE_TOKEN_IP', '30/min'),
+        'token_username': os.environ.get('THROTTLE_TOKEN_USERNAME', '10/min'),
+        # Лимит всех изменяющих запросов, по умолчанию выключен
+        'write': os.environ.get('THROTTLE_WRITE') or None,
+    },
 }
+# Наибольший размер страницы по `page_size`/`limit`; представления
+# задают свой предел атрибутом max_page_size
+API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', 100))
+
+# Кодировщик JSON для api.renderers: auto — orjson, если установлен, иначе
+# стандартный json; orjson или json — явный выбор
+API_JSON_BACKEND = os.environ.get('API_JSON_BACKEND', 'auto')
+
+# local — ведро в памяти процесса, cache — общее в кэше API_THROTTLE_CACHE
+API_THROTTLE_STORE = os.environ.get('API_THROTTLE_STORE', 'local')
+API_THROTTLE_CACHE = os.environ.get('API_THROTTLE_CACHE', 'default')
+
+# Версии токенов пользователей (users.models.get_token_version) и ответы
+# публичных эндпоинтов (api.cache) хранятся в кэше: при нескольких процессах
+# нужен общий бэкенд, например
+# CACHE_BACKEND=django.core.cache.backends.memcached.PyLibMCCache
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'default'),
+    },
+    'api': {
+        'BACKEND': os.environ.get(
+            'API_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('API_CACHE_LOCATION', 'api'),
+    },
+}
+API_CACHE_ALIAS = 'api'
+API_CACHE_TIMEOUT = int(os.environ.get('API_CACHE_TIMEOUT', 600))
+
+# Метрики запросов к API: /api/v1/metrics/ (для администратора) в формате
+# Prometheus, гистограммы хранятся в памяти каждого процесса отдельно
+API_METRICS_ENABLED = os.environ.get('API_METRICS_ENABLED', 'true') == 'true'
+API_SERVER_TIMING = os.environ.get('API_SERVER_TIMING', 'false') == 'true'
+# Отладка запросов к базе (api.querylog): log — писать в логгер api.queries
+# запросы медленнее API_SLOW_QUERY_MS и SELECT, повторённые за запрос не
+# меньше API_DUPLICATE_QUERIES раз (вероятный N+1); raise — падать с ошибкой
+API_QUERY_INSPECTOR = os.environ.get('API_QUERY_INSPECTOR', '')
+API_SLOW_QUERY_MS = float(os.environ.get('API_SLOW_QUERY_MS', 100))
+API_DUPLICATE_QUERIES = int(os.environ.get('API_DUPLICATE_QUERIES', 3))
+
+BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', 5000))
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=5),
@@ -132,4 +269,6 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 DEFAULT_FROM_EMAIL = 'from@yamdb.com'
 DEFAULT_EMAIL_SUBJECT = 'Your confirmation code'
+# После стольких неудачных попыток sendemails больше не отправляет письмо
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('EMAIL_OUTBOX_MAX_ATTEMPTS', 5))
 USER_ME = 'me'
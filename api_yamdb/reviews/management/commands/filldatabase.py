@@ -1,10 +1,14 @@
 import os
 import csv
+import time
 
 from django.contrib.auth import get_user_model
 from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
 from django.conf import settings
+from django.db import connection, transaction
 
+from api.cache import CATALOG, invalidate
 from reviews.models import (
     Category,
     Genre,
@@ -16,6 +20,7 @@ from reviews.models import (
 
 
 PATH = os.path.join(settings.BASE_DIR, 'static', 'data')
+BATCH_SIZE = 5000
 User = get_user_model()
 
 FILE_TO_TABLE = {
@@ -28,28 +33,90 @@ FILE_TO_TABLE = {
     'comments.csv': Comment,
 }
 
+# CSV column -> (model attribute, referenced model)
+FOREIGN_KEYS = {
+    Title: {'category': ('category_id', Category)},
+    GenreTitle: {
+        'title_id': ('title_id', Title),
+        'genre_id': ('genre_id', Genre),
+    },
+    Review: {
+        'title_id': ('title_id', Title),
+        'author': ('author_id', User),
+    },
+    Comment: {
+        'review_id': ('review_id', Review),
+        'author': ('author_id', User),
+    },
+}
+
 
 class Command(BaseCommand):
     help = 'Fills the database'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=PATH)
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
     def handle(self, *args, **kwargs):
+        self.loaded_ids = {}
         for file_name, model in FILE_TO_TABLE.items():
-            model.objects.all().delete()
-            if file_name not in os.listdir(PATH):
+            file_path = os.path.join(kwargs['path'], file_name)
+            with transaction.atomic():
+                model.objects.all().delete()
+                if not os.path.exists(file_path):
+                    self.loaded_ids[model] = set()
+                    continue
+                self.load_file(file_path, model, kwargs['batch_size'])
+            self.reset_sequence(model)
+        Title.objects.rebuild_rating()
+        invalidate(CATALOG)
+
+    def load_file(self, file_path, model, batch_size):
+        started = time.monotonic()
+        foreign_keys = FOREIGN_KEYS.get(model, {})
+        ids = set()
+        batch = []
+        loaded = skipped = 0
+        with open(file_path, 'r', encoding='utf-8') as file:
+            lines = csv.reader(file, delimiter=',', quotechar='"')
+            header = next(lines)
+            for line in lines:
+                data = dict(zip(header, line))
+                if not self.resolve_foreign_keys(data, foreign_keys):
+                    skipped += 1
+                    continue
+                ids.add(int(data['id']))
+                batch.append(model(**data))
+                if len(batch) >= batch_size:
+                    model.objects.bulk_create(batch)
+                    loaded += len(batch)
+                    batch = []
+        if batch:
+            model.objects.bulk_create(batch)
+            loaded += len(batch)
+        self.loaded_ids[model] = ids
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'{os.path.basename(file_path)}: {loaded} rows '
+            f'in {elapsed:.2f}s ({loaded / max(elapsed, 1e-6):.0f} rows/s)'
+            + (f', {skipped} skipped' if skipped else '')
+        )
+
+    def resolve_foreign_keys(self, data, foreign_keys):
+        for column, (attribute, related_model) in foreign_keys.items():
+            value = data.pop(column)
+            if value == '':
+                data[attribute] = None
                 continue
-            with open(
-                    os.path.join(PATH, file_name),
-                    'r',
-                    encoding='utf-8') as file:
-                lines = csv.reader(file, delimiter=',', quotechar='"')
-                header = next(lines)
-                for line in lines:
-                    print(line)
-                    data = {key: value for key, value in zip(header, line)}
-                    if model is Title:
-                        data['category'] = Category.objects.get(
-                            id=int(data['category']))
-                    elif model is Comment or model is Review:
-                        data['author'] = User.objects.get(
-                            id=int(data['author']))
-                    model.objects.create(**data)
+            value = int(value)
+            if value not in self.loaded_ids[related_model]:
+                return False
+            data[attribute] = value
+        return True
+
+    def reset_sequence(self, model):
+        statements = connection.ops.sequence_reset_sql(no_style(), [model])
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.cache import CATALOG, invalidate
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the stored title rating and score histogram from reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report titles with drifted statistics, do not rebuild',
+        )
+
+    def handle(self, *args, **options):
+        drifted = list(
+            Title.objects.with_drifted_rating().values_list('id', flat=True)
+        )
+        self.stdout.write(f'Titles with drifted rating: {len(drifted)}')
+        if options['check']:
+            if drifted:
+                raise CommandError(
+                    'Rating drift found for titles: '
+                    + ', '.join(str(title_id) for title_id in drifted[:20])
+                )
+            return
+        with transaction.atomic():
+            rebuilt = Title.objects.rebuild_rating()
+        invalidate(CATALOG)
+        self.stdout.write(
+            self.style.SUCCESS(f'Rating rebuilt for {rebuilt} titles')
+        )
@@ -0,0 +1,14 @@
+from django.db import migrations
+
+from reviews.search import create_search_index, drop_search_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_pub_date_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 2.2.16 on 2026-10-18 21:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+import reviews.search
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_title_score_histogram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleSearchIndex',
+            fields=[
+                ('title', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='reviews.Title')),
+                ('document', reviews.search.MatchField(db_column='reviews_title_fts')),
+            ],
+            options={
+                'db_table': 'reviews_title_fts',
+                'managed': False,
+            },
+        ),
+    ]
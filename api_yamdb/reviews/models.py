@@ -1,8 +1,16 @@
 from django.db import models
+from django.db.models import (Case, Count, F, FloatField, OuterRef, Q,
+                              Subquery, Sum, Value, When)
+from django.db.models.functions import Cast, Coalesce
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 
 from users.models import User
+from .search import FTS_TABLE, MatchField, search_titles
 from .validators import validate_score, validate_year
 
+SCORES = range(1, 11)
+
 
 class Category(models.Model):
     name = models.CharField(max_length=256)
@@ -20,6 +28,89 @@ class Genre(models.Model):
     slug = models.SlugField(max_length=50, unique=True)
 
 
+class TitleQuerySet(models.QuerySet):
+    def change_rating(self, added=None, removed=None):
+        """Учитывает добавленную и/или удалённую оценку одним UPDATE."""
+        score_delta = (added or 0) - (removed or 0)
+        count_delta = (added is not None) - (removed is not None)
+        scores = {}
+        if added is not None:
+            scores[f'score_{added}'] = F(f'score_{added}') + 1
+        if removed is not None:
+            field = f'score_{removed}'
+            scores[field] = scores.get(field, F(field)) - 1
+        rating_sum = F('rating_sum') + score_delta
+        rating_count = F('rating_count') + count_delta
+        return self.update(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            rating=Case(
+                When(rating_count__lte=-count_delta, then=Value(None)),
+                default=Cast(rating_sum, FloatField()) / rating_count,
+                output_field=FloatField()
+            ),
+            **scores
+        )
+
+    def search(self, query):
+        return search_titles(self, query)
+
+    def with_actual_rating(self):
+        return self.annotate(
+            actual_rating_sum=Coalesce(Sum('reviews__score'), 0),
+            actual_rating_count=Count('reviews'),
+            **{
+                f'actual_score_{score}': Count(
+                    'reviews', filter=Q(reviews__score=score)
+                )
+                for score in SCORES
+            }
+        )
+
+    def with_drifted_rating(self):
+        return self.with_actual_rating().exclude(
+            rating_sum=F('actual_rating_sum'),
+            rating_count=F('actual_rating_count'),
+            **{
+                f'score_{score}': F(f'actual_score_{score}')
+                for score in SCORES
+            }
+        )
+
+    def rebuild_rating(self):
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        self.update(
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                0
+            ),
+            rating_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('pk')).values('total')),
+                0
+            ),
+            **{
+                f'score_{score}': Coalesce(
+                    Subquery(reviews.filter(score=score).annotate(
+                        total=Count('pk')
+                    ).values('total')),
+                    0
+                )
+                for score in SCORES
+            }
+        )
+        return self.update(
+            rating=Case(
+                When(rating_count=0, then=Value(None)),
+                default=(
+                    Cast(F('rating_sum'), FloatField()) / F('rating_count')
+                ),
+                output_field=FloatField()
+            )
+        )
+
+
 class Title(models.Model):
     name = models.TextField()
     year = models.IntegerField(validators=[validate_year],)
@@ -34,6 +125,50 @@ class Title(models.Model):
         null=True,
         blank=True,
         on_delete=models.SET_NULL)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating = models.FloatField(
+        null=True,
+        blank=True
+    )
+    # Число отзывов с каждой оценкой
+    score_1 = models.PositiveIntegerField(default=0)
+    score_2 = models.PositiveIntegerField(default=0)
+    score_3 = models.PositiveIntegerField(default=0)
+    score_4 = models.PositiveIntegerField(default=0)
+    score_5 = models.PositiveIntegerField(default=0)
+    score_6 = models.PositiveIntegerField(default=0)
+    score_7 = models.PositiveIntegerField(default=0)
+    score_8 = models.PositiveIntegerField(default=0)
+    score_9 = models.PositiveIntegerField(default=0)
+    score_10 = models.PositiveIntegerField(default=0)
+
+    objects = TitleQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['year'], name='title_year_idx')
+        ]
+
+    @property
+    def scores(self):
+        return {score: getattr(self, f'score_{score}') for score in SCORES}
+
+
+class TitleSearchIndex(models.Model):
+    """Строка FTS5-индекса произведений; таблица есть только в SQLite."""
+    title = models.OneToOneField(
+        Title,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search_index',
+        on_delete=models.DO_NOTHING
+    )
+    document = MatchField(db_column=FTS_TABLE)
+
+    class Meta:
+        managed = False
+        db_table = FTS_TABLE
 
 
 class GenreTitle(models.Model):
@@ -41,9 +176,11 @@ class GenreTitle(models.Model):
     title = models.ForeignKey('Title', on_delete=models.CASCADE)
 
     class Meta:
-        models.constraints.UniqueConstraint(
-            fields=('genre', 'title'), name='unique_genre_title'
-        )
+        constraints = [
+            models.UniqueConstraint(
+                fields=('genre', 'title'), name='unique_genre_title'
+            )
+        ]
 
     def __str__(self):
         return f'{self.genre.name[:20]}-{self.title.name[:20]}'
@@ -69,12 +206,24 @@ class Review(models.Model):
     )
 
     class Meta:
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
         constraints = [
             models.UniqueConstraint(
                 fields=['title', 'author'],
                 name='title_author_unique')
         ]
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', '-id'],
+                name='review_title_pub_date_idx')
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Оценка до изменения: на неё правится рейтинг при сохранении
+        instance.saved_score = instance.__dict__.get('score')
+        return instance
 
 
 class Comment(models.Model):
@@ -94,4 +243,28 @@ class Comment(models.Model):
     )
 
     class Meta:
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date', '-id'],
+                name='comment_review_pub_date_idx')
+        ]
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, using, **kwargs):
+    score = int(instance.score)
+    saved_score = None if created else getattr(instance, 'saved_score', None)
+    if created or saved_score is not None and saved_score != score:
+        Title.objects.using(using).filter(pk=instance.title_id).change_rating(
+            added=score, removed=saved_score
+        )
+    instance.saved_score = score
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, using, **kwargs):
+    # В том числе каскадное удаление вместе с автором
+    Title.objects.using(using).filter(pk=instance.title_id).change_rating(
+        removed=int(instance.score)
+    )
@@ -0,0 +1,144 @@
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Lookup, Q, TextField
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'reviews_title_fts'
+# Совпадение в названии весит больше, чем в описании
+NAME_WEIGHT, DESCRIPTION_WEIGHT = 10.0, 1.0
+TSVECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce({table}name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce({table}description, '')), 'B')"
+)
+WORD = re.compile(r'\w+')
+fts_tables = {}
+
+SQLITE_CREATE = (
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    "name, description, content='reviews_title', content_rowid='id', "
+    "tokenize='unicode61')",
+    f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON reviews_title BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON reviews_title BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF name, description "
+    "ON reviews_title BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+)
+SQLITE_DROP = (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+POSTGRESQL_CREATE = (
+    'CREATE INDEX IF NOT EXISTS reviews_title_search_idx ON reviews_title '
+    f'USING gin ({TSVECTOR_SQL.format(table="")})',
+)
+POSTGRESQL_DROP = ('DROP INDEX IF EXISTS reviews_title_search_idx',)
+
+
+class Match(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+class MatchField(TextField):
+    """Скрытая колонка FTS5 с именем таблицы: по ней пишется MATCH."""
+
+
+MatchField.register_lookup(Match)
+
+
+def sqlite_has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        if not sqlite_has_fts5(connection):
+            return
+        statements = SQLITE_DROP + SQLITE_CREATE
+    elif connection.vendor == 'postgresql':
+        statements = POSTGRESQL_CREATE
+    else:
+        return
+    for statement in statements:
+        schema_editor.execute(statement, params=None)
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    statements = {
+        'sqlite': SQLITE_DROP,
+        'postgresql': POSTGRESQL_DROP,
+    }.get(connection.vendor, ())
+    for statement in statements:
+        schema_editor.execute(statement, params=None)
+
+
+def has_fts_table(connection):
+    if connection.alias not in fts_tables:
+        fts_tables[connection.alias] = (
+            FTS_TABLE in connection.introspection.table_names()
+        )
+    return fts_tables[connection.alias]
+
+
+def search_words(query):
+    return WORD.findall(query.lower())
+
+
+def search_titles(queryset, query):
+    """Произведения, найденные по всем словам запроса, по релевантности.
+
+    Курсорная пагинация заменяет сортировку своей, по `id`.
+    """
+    words = search_words(query)
+    if not words:
+        return queryset.none()
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    if connection.vendor == 'sqlite' and has_fts_table(connection):
+        match = ' AND '.join(f'"{word}"*' for word in words)
+        # Индекс присоединяется один раз: MATCH и bm25 считаются в том же
+        # просмотре FTS5, а произведения читаются по первичному ключу.
+        # bm25 только в сортировке: COUNT(*) с аннотацией группирует по ней,
+        # а там FTS5 её не вычисляет
+        rank = RawSQL(
+            f'bm25({FTS_TABLE}, {NAME_WEIGHT}, {DESCRIPTION_WEIGHT})', ()
+        )
+        return queryset.filter(
+            search_index__document__match=match
+        ).order_by(rank.asc(), 'id')
+    if connection.vendor == 'postgresql':
+        vector = TSVECTOR_SQL.format(table=f'{table}.')
+        tsquery = ' & '.join(f'{word}:*' for word in words)
+        return queryset.annotate(
+            search_match=RawSQL(
+                f"{vector} @@ to_tsquery('simple', %s)", [tsquery],
+                output_field=BooleanField()
+            ),
+            search_rank=RawSQL(
+                f"ts_rank({vector}, to_tsquery('simple', %s))", [tsquery],
+                output_field=FloatField()
+            ),
+        ).filter(search_match=True).order_by('-search_rank', 'id')
+    condition = Q()
+    for word in words:
+        condition &= Q(name__icontains=word) | Q(description__icontains=word)
+    return queryset.filter(condition)
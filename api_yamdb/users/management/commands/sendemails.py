@@ -0,0 +1,144 @@
+import time
+from contextlib import suppress
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from api.metrics import registry, serve_metrics
+from users.models import EmailOutbox
+
+
+class Command(BaseCommand):
+    help = 'Sends queued emails from the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--max-attempts', type=int,
+            default=settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+        )
+        parser.add_argument(
+            '--backoff', type=float, default=30,
+            help='Delay in seconds before the first retry, doubled each time',
+        )
+        parser.add_argument(
+            '--lease', type=float, default=300,
+            help='Seconds a claimed email is hidden from other senders',
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep draining the outbox instead of exiting when empty',
+        )
+        parser.add_argument('--interval', type=float, default=5)
+        parser.add_argument(
+            '--metrics-port', type=int,
+            help='Serve Prometheus metrics of this process on the port',
+        )
+
+    def handle(self, *args, **options):
+        if options['metrics_port']:
+            serve_metrics(options['metrics_port'])
+        while True:
+            sent = self.send_batch(options)
+            if sent:
+                continue
+            self.write_stats(options['max_attempts'])
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def claim_batch(self, options):
+        """Берёт письма в аренду: пока она не истекла, их не выберут."""
+        with transaction.atomic():
+            emails = list(
+                EmailOutbox.objects.due(options['max_attempts'])
+                .select_for_update(skip_locked=True)
+                .order_by('id')[:options['batch_size']]
+            )
+            EmailOutbox.objects.filter(
+                id__in=[email.id for email in emails]
+            ).update(
+                next_attempt_at=timezone.now() + timedelta(
+                    seconds=options['lease']
+                )
+            )
+        return emails
+
+    def send_batch(self, options):
+        emails = self.claim_batch(options)
+        if not emails:
+            return 0
+        # Отправка идёт вне транзакции: медленный SMTP-сервер
+        # не держит блокировку записи в базу
+        sent, failed = [], []
+        # Одно соединение на пачку: между пачками сервер мог закрыть его
+        # по таймауту простоя
+        connection = get_connection()
+        reconnect = True
+        try:
+            for email in emails:
+                if reconnect:
+                    # Бэкенд не открывает соединение заново, пока считает
+                    # его открытым; ошибку открытия запишет send() письма
+                    with suppress(Exception):
+                        connection.close()
+                    with suppress(Exception):
+                        connection.open()
+                message = EmailMessage(
+                    subject=email.subject,
+                    body=email.message,
+                    from_email=email.from_email,
+                    to=(email.recipient,),
+                    connection=connection,
+                )
+                try:
+                    message.send()
+                except Exception as error:
+                    email.attempts += 1
+                    email.last_error = str(error)
+                    email.next_attempt_at = timezone.now() + timedelta(
+                        seconds=options['backoff'] * 2 ** (email.attempts - 1)
+                    )
+                    failed.append(email)
+                    reconnect = True
+                else:
+                    email.attempts += 1
+                    email.sent_at = timezone.now()
+                    sent.append(email)
+                    reconnect = False
+        finally:
+            with suppress(Exception):
+                connection.close()
+        with transaction.atomic():
+            EmailOutbox.objects.bulk_update(
+                sent, ('attempts', 'sent_at')
+            )
+            EmailOutbox.objects.bulk_update(
+                failed, ('attempts', 'last_error', 'next_attempt_at')
+            )
+        latencies = [
+            (email.sent_at - email.created).total_seconds() for email in sent
+        ]
+        for latency in latencies:
+            registry.observe_value('email_delivery_seconds', latency)
+        if sent:
+            latency = max(latencies)
+            self.stdout.write(
+                f'Sent {len(sent)}, failed {len(failed)}, '
+                f'max delivery latency {latency:.1f}s'
+            )
+        elif failed:
+            self.stdout.write(f'Sent 0, failed {len(failed)}')
+        return len(emails)
+
+    def write_stats(self, max_attempts):
+        stats = EmailOutbox.objects.stats(max_attempts)
+        self.stdout.write(
+            f'Outbox depth {stats["depth"]}, '
+            f'oldest pending {stats["oldest_pending_seconds"]:.1f}s, '
+            f'given up {stats["given_up"]}'
+        )
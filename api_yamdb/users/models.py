@@ -1,5 +1,9 @@
+from functools import partial
+
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
+from django.utils import timezone
 
 
 ADMIN = 'admin'
@@ -12,6 +16,39 @@ ROLES = (
     (USER, USER),
 )
 
+TOKEN_CLAIMS = ('username', 'role', 'is_staff', 'is_superuser', 'is_active')
+TOKEN_VERSION_CACHE_KEY = 'token_version:{}'
+TOKEN_REVOKED = -1
+
+
+def cache_token_version(user_id, version):
+    """Сохраняет версию, если она новее: отзыв токенов не перезаписать."""
+    key = TOKEN_VERSION_CACHE_KEY.format(user_id)
+    if cache.add(key, version):
+        return
+    cached = cache.get(key)
+    if cached == TOKEN_REVOKED or (
+        version != TOKEN_REVOKED and cached is not None and cached >= version
+    ):
+        return
+    cache.set(key, version)
+
+
+def get_token_version(user_id):
+    key = TOKEN_VERSION_CACHE_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = User.objects.filter(pk=user_id).values_list(
+            'token_version', flat=True
+        ).first()
+        if version is None:
+            version = TOKEN_REVOKED
+        # Пока читали базу, сохранение пользователя могло записать
+        # более новую версию: её не перезаписываем
+        if not cache.add(key, version):
+            version = cache.get(key, version)
+    return version
+
 
 class User(AbstractUser):
     username = models.CharField(
@@ -45,6 +82,7 @@ class User(AbstractUser):
         blank=True
     )
     confirmation_code = models.CharField(max_length=255)
+    token_version = models.PositiveIntegerField(default=0)
 
     class Meta:
         constraints = (
@@ -54,6 +92,41 @@ class User(AbstractUser):
             ),
         )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        if set(TOKEN_CLAIMS) <= set(field_names):
+            user._saved_token_claims = user.get_token_claims()
+        return user
+
+    def get_token_claims(self):
+        return tuple(getattr(self, claim) for claim in TOKEN_CLAIMS)
+
+    def save(self, *args, **kwargs):
+        saved_claims = getattr(self, '_saved_token_claims', None)
+        if (
+            saved_claims is not None
+            and saved_claims != self.get_token_claims()
+        ):
+            # Роль или права изменились: выданные раньше токены устаревают
+            self.token_version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
+            transaction.on_commit(
+                partial(cache_token_version, self.pk, self.token_version)
+            )
+        super().save(*args, **kwargs)
+        self._saved_token_claims = self.get_token_claims()
+
+    def delete(self, *args, **kwargs):
+        user_id = self.pk
+        result = super().delete(*args, **kwargs)
+        transaction.on_commit(
+            partial(cache_token_version, user_id, TOKEN_REVOKED)
+        )
+        return result
+
     @property
     def is_admin(self):
         return (self.role == ADMIN or self.is_staff
@@ -65,3 +138,74 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.username
+
+
+class TokenUser(User):
+    """Пользователь, собранный из утверждений токена без запроса к БД."""
+
+    class Meta:
+        proxy = True
+
+    @classmethod
+    def from_token(cls, token, user_id):
+        return cls(
+            id=user_id,
+            username=token['username'],
+            role=token['role'],
+            is_staff=token['is_staff'],
+            is_superuser=token['is_superuser'],
+            token_version=token['token_version'],
+        )
+
+    def save(self, *args, **kwargs):
+        raise TypeError('Пользователь из токена не хранится в БД')
+
+    def delete(self, *args, **kwargs):
+        raise TypeError('Пользователь из токена не хранится в БД')
+
+
+class EmailOutboxQuerySet(models.QuerySet):
+    def pending(self):
+        return self.filter(sent_at__isnull=True)
+
+    def due(self, max_attempts):
+        return self.pending().filter(
+            attempts__lt=max_attempts,
+            next_attempt_at__lte=timezone.now()
+        )
+
+    def stats(self, max_attempts):
+        pending = self.pending()
+        oldest = pending.aggregate(oldest=models.Min('created'))['oldest']
+        return {
+            'depth': pending.count(),
+            'oldest_pending_seconds': (
+                (timezone.now() - oldest).total_seconds() if oldest else 0
+            ),
+            'given_up': pending.filter(attempts__gte=max_attempts).count(),
+        }
+
+
+class EmailOutbox(models.Model):
+    recipient = models.EmailField(max_length=254)
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    from_email = models.EmailField(max_length=254)
+    created = models.DateTimeField(auto_now_add=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    objects = EmailOutboxQuerySet.as_manager()
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('sent_at', 'next_attempt_at'),
+                name='email_outbox_due_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
@@ -0,0 +1,13 @@
+import pytest
+from django.core.cache import caches
+
+from api.metrics import registry
+from api.throttling import local_store
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+    local_store.clear()
+    registry.clear()
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def fail_on_duplicate_queries(settings):
+    # Новый N+1 в API роняет тест с DuplicateQueriesError
+    settings.API_QUERY_INSPECTOR = 'raise'
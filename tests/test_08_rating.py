@@ -0,0 +1,87 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from reviews.models import Review, Title
+from .common import auth_client, create_reviews
+
+
+class Test08Rating:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_rating_stored_on_review_changes(self, admin_client, admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (12, 3), (
+            'Проверьте, что при создании отзыва обновляются '
+            '`rating_sum` и `rating_count` произведения'
+        )
+        assert title.rating == 4, (
+            'Проверьте, что при создании отзыва пересчитывается `rating`'
+        )
+
+        client_user = auth_client(user)
+        client_user.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/',
+            data={'score': 9}
+        )
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (18, 3), (
+            'Проверьте, что при изменении оценки отзыва обновляется '
+            '`rating_sum` произведения'
+        )
+
+        for review in reviews:
+            admin_client.delete(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}/'
+            )
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (0, 0), (
+            'Проверьте, что при удалении отзывов обновляется рейтинг'
+        )
+        assert title.rating is None, (
+            'Проверьте, что `rating` без отзывов равен `None`'
+        )
+        response = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json().get('rating') is None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_rebuild_rating_command(self, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        call_command('rebuildrating', '--check')
+
+        Title.objects.filter(pk=titles[0]['id']).update(
+            rating_sum=1, rating_count=1, rating=1
+        )
+        with pytest.raises(CommandError):
+            call_command('rebuildrating', '--check')
+
+        call_command('rebuildrating')
+        call_command('rebuildrating', '--check')
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            12, 3, 4
+        ), 'Проверьте, что команда `rebuildrating` пересчитывает рейтинг'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_rating_outside_view(self, admin_client, admin):
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 204
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count, title.score_3) == (
+            9, 2, 0
+        ), (
+            'Проверьте, что каскадное удаление отзывов вместе с автором '
+            'обновляет рейтинг произведения'
+        )
+        assert title.rating == 4.5
+
+        review = Review.objects.get(pk=reviews[0]['id'])
+        review.score = 10
+        review.save()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.score_5, title.score_10) == (
+            14, 0, 1
+        ), 'Проверьте, что изменение оценки через ORM обновляет рейтинг'
+        call_command('rebuildrating', '--check')
@@ -0,0 +1,50 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+
+
+def create_catalog(count):
+    category, _ = Category.objects.get_or_create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.get_or_create(name='Ужасы', slug='horror')[0],
+        Genre.objects.get_or_create(name='Комедия', slug='comedy')[0],
+    ]
+    titles = []
+    for number in range(count):
+        title = Title.objects.create(
+            name=f'Произведение {number}', year=2000, category=category
+        )
+        title.genre.set(genres)
+        titles.append(title)
+    return titles
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context.captured_queries)
+
+
+class Test09TitleQueries:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_title_list_queries(self, client):
+        create_catalog(1)
+        one_title = count_queries(client, '/api/v1/titles/')
+        create_catalog(4)
+        full_page = count_queries(client, '/api/v1/titles/')
+        assert one_title == full_page, (
+            'Проверьте, что количество запросов к БД при GET запросе '
+            '`/api/v1/titles/` не зависит от количества произведений '
+            f'на странице: {one_title} != {full_page}'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_title_detail_queries(self, client, django_assert_num_queries):
+        titles = create_catalog(1)
+        with django_assert_num_queries(2):
+            response = client.get(f'/api/v1/titles/{titles[0].id}/')
+        assert len(response.json()['genre']) == 2
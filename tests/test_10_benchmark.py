@@ -0,0 +1,45 @@
+import pytest
+
+from api.benchmark import compare, run_benchmark, seed
+
+
+class Test10Benchmark:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_benchmark_covers_endpoints(self, settings):
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        seed({
+            'users': 3, 'categories': 2, 'genres': 2, 'titles': 4,
+            'reviews_per_title': 2, 'comments_per_review': 1,
+        })
+        results = run_benchmark(repeat=2)
+        routes = {result['route'] for result in results.values()}
+        for route in (
+            'categories-list', 'genres-list', 'titles-list', 'titles-detail',
+            'reviews-list', 'reviews-detail', 'comments-list',
+            'comments-detail', 'users-list', 'users-detail',
+            'users-set-profile', 'signup', 'gettoken',
+        ):
+            assert route in routes, f'Эндпоинт `{route}` не попал в отчёт'
+        for endpoint, result in results.items():
+            assert result['status'] == 200, (
+                f'{endpoint} вернул статус {result["status"]}'
+            )
+            assert result['p95_ms'] >= result['p50_ms']
+            assert result['warm_p95_ms'] >= result['warm_p50_ms']
+        for endpoint in ('GET /api/v1/titles/', 'GET /api/v1/genres/'):
+            assert (
+                results[endpoint]['queries'] > results[endpoint]['warm_queries']
+            ), (
+                'Проверьте, что `queries` считаются на холодном вызове, '
+                'а не на ответе из кэша'
+            )
+        assert compare(results, results) == []
+
+        slower = {
+            endpoint: {**result, 'queries': result['queries'] + 1}
+            for endpoint, result in results.items()
+        }
+        assert len(compare(results, slower)) == len(results), (
+            'Проверьте, что рост числа запросов считается регрессией'
+        )
@@ -0,0 +1,56 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Category, Comment, Review, Title
+
+
+class Test11FillDatabase:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_filldatabase(self, tmp_path, django_user_model):
+        (tmp_path / 'users.csv').write_text(
+            'id,username,email,role,bio,first_name,last_name\n'
+            '100,bingobongo,bingobongo@yamdb.fake,user,,,\n'
+            '101,capt_obvious,capt_obvious@yamdb.fake,admin,,,\n',
+            encoding='utf-8'
+        )
+        (tmp_path / 'category.csv').write_text(
+            'id,name,slug\n1,Фильм,movie\n', encoding='utf-8'
+        )
+        (tmp_path / 'titles.csv').write_text(
+            'id,name,year,category\n'
+            '1,Побег из Шоушенка,1994,1\n'
+            '2,Крестный отец,1972,7\n',
+            encoding='utf-8'
+        )
+        (tmp_path / 'review.csv').write_text(
+            'id,title_id,text,author,score,pub_date\n'
+            '1,1,"Ставлю десять звёзд!\nЛучший фильм",100,10,'
+            '2019-09-24T21:08:21.567Z\n'
+            '2,1,Неплохо,101,6,2019-09-24T21:08:21.567Z\n',
+            encoding='utf-8'
+        )
+        (tmp_path / 'comments.csv').write_text(
+            'id,review_id,text,author,pub_date\n'
+            '1,1,"Ничего подобного",101,2020-01-13T23:20:02.422Z\n'
+            '2,5,Нет такого отзыва,101,2020-01-13T23:20:02.422Z\n',
+            encoding='utf-8'
+        )
+        call_command('filldatabase', path=str(tmp_path), batch_size=1)
+
+        assert django_user_model.objects.count() == 2
+        assert Category.objects.count() == 1
+        assert list(Title.objects.values_list('id', flat=True)) == [1], (
+            'Проверьте, что строки со ссылкой на несуществующую запись '
+            'пропускаются'
+        )
+        assert Review.objects.count() == 2
+        assert Comment.objects.count() == 1
+        title = Title.objects.get(pk=1)
+        assert (title.rating_count, title.rating) == (2, 8), (
+            'Проверьте, что после загрузки пересчитывается рейтинг'
+        )
+        category = Category.objects.create(name='Книга', slug='book')
+        assert category.id > 1, (
+            'Проверьте, что после загрузки сбрасывается счётчик id'
+        )
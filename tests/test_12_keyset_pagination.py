@@ -0,0 +1,80 @@
+import pytest
+
+from reviews.models import Review, Title
+
+
+def walk(client, url, key):
+    ids = []
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что в режиме курсора не выполняется подсчёт `count`'
+        )
+        ids.extend(item[key] for item in data['results'])
+        pages.append(data)
+        url = data['next']
+    return ids, pages
+
+
+class Test12KeysetPagination:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_cursor(self, client):
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {number}', year=2000)
+            for number in range(12)
+        )
+        expected = list(Title.objects.order_by('id').values_list('id', flat=True))
+        ids, pages = walk(client, '/api/v1/titles/?cursor=', 'id')
+        assert ids == expected, (
+            'Проверьте, что курсорная пагинация `/api/v1/titles/` '
+            'возвращает все произведения по порядку'
+        )
+        assert pages[0]['previous'] is None
+        assert len(pages) == 3
+
+        response = client.get(pages[-1]['previous'])
+        assert [item['id'] for item in response.json()['results']] == (
+            expected[5:10]
+        ), 'Проверьте ссылку `previous` в режиме курсора'
+
+        response = client.get('/api/v1/titles/?page=2')
+        assert response.json()['count'] == 12, (
+            'Проверьте, что без курсора пагинация по номерам страниц сохранилась'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_cursor(self, client, django_user_model):
+        title = Title.objects.create(name='Произведение', year=2000)
+        for number in range(11):
+            author = django_user_model.objects.create(
+                username=f'user{number}', email=f'user{number}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text='Текст', score=5
+            )
+        # Одинаковая дата у всех отзывов: порядок задаёт `id`
+        Review.objects.update(pub_date=Review.objects.first().pub_date)
+        expected = list(title.reviews.values_list('id', flat=True))
+        assert expected == sorted(expected, reverse=True)
+
+        url = f'/api/v1/titles/{title.id}/reviews/?cursor='
+        ids, pages = walk(client, url, 'id')
+        assert ids == expected, (
+            'Проверьте, что курсорная пагинация отзывов учитывает '
+            '`pub_date` и `id`'
+        )
+        response = client.get(pages[-1]['previous'])
+        data = response.json()
+        assert [item['id'] for item in data['results']] == expected[5:10], (
+            'Проверьте ссылку `previous` в режиме курсора'
+        )
+        assert data['next'] == pages[1]['next']
+
+        response = client.get(f'/api/v1/titles/{title.id}/reviews/?cursor=xyz')
+        assert response.status_code == 404, (
+            'Проверьте, что при неверном курсоре возвращается статус 404'
+        )
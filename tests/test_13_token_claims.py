@@ -0,0 +1,118 @@
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from reviews.models import Review, Title
+from users.models import (TOKEN_REVOKED, TOKEN_VERSION_CACHE_KEY, TokenUser,
+                          cache_token_version, get_token_version)
+
+
+def claims_client(user):
+    type(user).objects.filter(pk=user.pk).update(confirmation_code='code')
+    response = APIClient().post(
+        '/api/v1/auth/token/',
+        data={'username': user.username, 'confirmation_code': 'code'}
+    )
+    assert response.status_code == 200
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.json()["token"]}')
+    return client
+
+
+def user_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if 'FROM "users_user"' in query['sql']
+    ]
+
+
+class Test13TokenClaims:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_no_user_query(self, user):
+        cache.clear()
+        client = claims_client(user)
+        title = Title.objects.create(name='Произведение', year=2000)
+        client.get('/api/v1/titles/')
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(
+                f'/api/v1/titles/{title.id}/reviews/',
+                data={'text': 'Текст', 'score': 7}
+            )
+        assert response.status_code == 201
+        assert response.json()['author'] == user.username
+        assert Review.objects.get().author_id == user.id
+        assert user_queries(context) == [], (
+            'Проверьте, что токен с утверждениями о пользователе '
+            'не требует запроса пользователя из БД'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_role_change_revokes_token(self, admin_client, user):
+        cache.clear()
+        client = claims_client(user)
+        assert client.get('/api/v1/users/').status_code == 403
+
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == 200
+        assert client.get('/api/v1/users/').status_code == 401, (
+            'Проверьте, что после смены роли старый токен отклоняется'
+        )
+        assert claims_client(user).get('/api/v1/users/').status_code == 200
+
+        client = claims_client(user)
+        user.delete()
+        assert client.get('/api/v1/titles/').status_code == 401, (
+            'Проверьте, что токен удалённого пользователя отклоняется'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_stale_version_not_cached(self, user, monkeypatch):
+        cache.clear()
+        key = TOKEN_VERSION_CACHE_KEY.format(user.pk)
+        cache_token_version(user.pk, 2)
+        cache_token_version(user.pk, 1)
+        assert cache.get(key) == 2, (
+            'Проверьте, что более старая версия токена не перезаписывает новую'
+        )
+        cache_token_version(user.pk, TOKEN_REVOKED)
+        cache_token_version(user.pk, 3)
+        assert cache.get(key) == TOKEN_REVOKED
+
+        # Запрос не нашёл версию в кэше и прочитал из базы старую, а
+        # сохранение пользователя тем временем записало новую
+        cache.set(key, 5)
+        cache_get = cache.get
+        misses = iter([None])
+        monkeypatch.setattr(
+            cache, 'get', lambda *args: next(misses, None) or cache_get(*args)
+        )
+        assert get_token_version(user.pk) == 5
+        assert cache_get(key) == 5, (
+            'Проверьте, что версия из базы не перезаписывает версию, '
+            'сохранённую в кэше за время запроса'
+        )
+
+    def test_04_token_user_not_saved(self):
+        token_user = TokenUser.from_token({
+            'username': 'user', 'role': 'user', 'is_staff': False,
+            'is_superuser': False, 'token_version': 0,
+        }, 1)
+        for method in (token_user.save, token_user.delete):
+            with pytest.raises(TypeError):
+                method()
+
+    @pytest.mark.django_db
+    def test_05_migrations(self):
+        try:
+            call_command('makemigrations', check=True, dry_run=True)
+        except SystemExit:
+            pytest.fail(
+                'Проверьте, что для новых полей и моделей (`token_version`, '
+                '`EmailOutbox`) есть миграции'
+            )
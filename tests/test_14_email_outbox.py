@@ -0,0 +1,154 @@
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from users.models import EmailOutbox
+
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+class CheckingBackend(BaseEmailBackend):
+    """Записывает, была ли открыта транзакция и аренда письма."""
+    checks = []
+
+    def send_messages(self, email_messages):
+        email = EmailOutbox.objects.get()
+        self.checks.append((
+            connection.in_atomic_block,
+            email.next_attempt_at > timezone.now(),
+        ))
+        return len(email_messages)
+
+
+class DroppingBackend(BaseEmailBackend):
+    """Как SMTP: соединение рвётся после первого письма, а open() не
+    открывает новое, пока старое не закрыто."""
+    sent = []
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.connection = None
+
+    def open(self):
+        if self.connection is not None:
+            return False
+        self.connection = {'sent': 0}
+        return True
+
+    def close(self):
+        self.connection = None
+
+    def send_messages(self, email_messages):
+        new_connection = self.open()
+        if self.connection['sent']:
+            raise ConnectionError('Соединение закрыто сервером')
+        self.connection['sent'] += len(email_messages)
+        self.sent.extend(email_messages)
+        if new_connection:
+            self.close()
+        return len(email_messages)
+
+
+def queue_emails(count):
+    EmailOutbox.objects.bulk_create(
+        EmailOutbox(
+            recipient=f'user{number}@yamdb.fake', subject='Код',
+            message='123', from_email='from@yamdb.fake'
+        ) for number in range(count)
+    )
+
+
+class Test14EmailOutbox:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_queues_email(self, client):
+        outbox_before_count = len(mail.outbox)
+        data = {'email': 'queued@yamdb.fake', 'username': 'queued'}
+        response = client.post('/api/v1/auth/signup/', data=data)
+        assert response.status_code == 200
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что регистрация не отправляет письмо сама, '
+            'а ставит его в очередь'
+        )
+        email = EmailOutbox.objects.get()
+        assert email.recipient == data['email']
+        assert email.sent_at is None
+
+        call_command('sendemails')
+        assert len(mail.outbox) == outbox_before_count + 1
+        email.refresh_from_db()
+        assert email.sent_at is not None
+        assert EmailOutbox.objects.stats(max_attempts=5)['depth'] == 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_failed_email_retried(self, client, settings):
+        client.post(
+            '/api/v1/auth/signup/',
+            data={'email': 'retry@yamdb.fake', 'username': 'retry'}
+        )
+        settings.EMAIL_BACKEND = 'tests.test_14_email_outbox.FailingBackend'
+        call_command('sendemails', backoff=0)
+        email = EmailOutbox.objects.get()
+        assert email.sent_at is None
+        assert email.attempts == 5, (
+            'Проверьте, что неудачная отправка повторяется '
+            'до `--max-attempts` раз'
+        )
+        assert 'SMTP' in email.last_error
+        assert EmailOutbox.objects.stats(max_attempts=5)['given_up'] == 1
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        EmailOutbox.objects.update(attempts=0)
+        call_command('sendemails')
+        email.refresh_from_db()
+        assert email.sent_at is not None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_sent_outside_transaction(self, client, settings):
+        client.post(
+            '/api/v1/auth/signup/',
+            data={'email': 'lease@yamdb.fake', 'username': 'lease'}
+        )
+        settings.EMAIL_BACKEND = 'tests.test_14_email_outbox.CheckingBackend'
+        CheckingBackend.checks.clear()
+        call_command('sendemails')
+        assert CheckingBackend.checks == [(False, True)], (
+            'Проверьте, что письмо отправляется вне транзакции, а на время '
+            'отправки взято в аренду через `next_attempt_at`'
+        )
+        assert EmailOutbox.objects.get().sent_at is not None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_reconnect_after_error(self, settings):
+        queue_emails(3)
+        settings.EMAIL_BACKEND = 'tests.test_14_email_outbox.DroppingBackend'
+        DroppingBackend.sent.clear()
+        call_command('sendemails', backoff=0)
+        assert EmailOutbox.objects.pending().count() == 0, (
+            'Проверьте, что после ошибки отправки соединение открывается '
+            'заново, а не используется разорванное'
+        )
+        assert sorted(
+            EmailOutbox.objects.values_list('attempts', flat=True)
+        ) == [1, 1, 2]
+        assert len(DroppingBackend.sent) == 3
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_metrics(self, admin_client):
+        queue_emails(2)
+        call_command('sendemails', batch_size=1)
+        queue_emails(1)
+        text = admin_client.get('/api/v1/metrics/').content.decode()
+        assert 'email_delivery_seconds_count 2' in text, (
+            'Проверьте, что задержка доставки писем есть в метриках'
+        )
+        assert 'email_outbox_depth 1' in text, (
+            'Проверьте, что глубина очереди писем есть в метриках'
+        )
+        assert 'email_outbox_given_up 0' in text
@@ -0,0 +1,99 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+from .common import create_reviews
+
+
+def get_with_queries(client, url, **headers):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, **headers)
+    return response, len(context.captured_queries)
+
+
+class Test15ResponseCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_cached_and_conditional(self, client, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        url = '/api/v1/titles/?year=2000'
+        response, _ = get_with_queries(client, url)
+        assert response.status_code == 200
+        etag = response['ETag']
+        assert response['Last-Modified']
+
+        cached, queries = get_with_queries(client, url)
+        assert queries == 0, (
+            'Проверьте, что повторный GET запрос `/api/v1/titles/` '
+            'отдаётся из кэша без запросов к БД'
+        )
+        assert cached.content == response.content
+
+        response, queries = get_with_queries(
+            client, url, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 304, (
+            'Проверьте, что при совпадении `If-None-Match` возвращается 304'
+        )
+        assert queries == 0
+
+        other, _ = get_with_queries(client, '/api/v1/titles/?year=2020')
+        assert other.json()['count'] == 1, (
+            'Проверьте, что параметры фильтра входят в ключ кэша'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_invalidation(self, client, admin_client, admin):
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        first_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        second_url = f'/api/v1/titles/{titles[1]["id"]}/'
+        assert client.get(first_url).json()['rating'] == 4
+        client.get(second_url)
+        client.get('/api/v1/categories/')
+
+        admin_client.patch(
+            f'{first_url}reviews/{reviews[0]["id"]}/', data={'score': 8}
+        )
+        assert client.get(first_url).json()['rating'] == 5, (
+            'Проверьте, что изменение отзыва сбрасывает кэш произведения'
+        )
+        _, queries = get_with_queries(client, second_url)
+        assert queries == 0, (
+            'Проверьте, что изменение отзыва не сбрасывает кэш '
+            'других произведений'
+        )
+
+        category = Category.objects.get(slug=titles[0]['category'])
+        category.name = 'Кино'
+        category.save()
+        assert client.get(first_url).json()['category']['name'] == 'Кино'
+        assert 'Кино' in {
+            item['name']
+            for item in client.get('/api/v1/categories/').json()['results']
+        }
+
+        title = Title.objects.get(pk=titles[1]['id'])
+        title.genre.add(Genre.objects.get(slug='horror'))
+        assert len(client.get(second_url).json()['genre']) == 2, (
+            'Проверьте, что изменение жанров произведения сбрасывает кэш'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_host_in_key(self, client):
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {number}', year=2000)
+            for number in range(7)
+        )
+        url = '/api/v1/titles/'
+        poisoned = client.get(url, HTTP_HOST='evil.com').json()
+        assert poisoned['next'].startswith('http://evil.com/')
+        response = client.get(url)
+        assert response.json()['next'].startswith('http://testserver/'), (
+            'Проверьте, что хост запроса входит в ключ кэша: иначе ответ '
+            'с чужим `Host` отдаёт всем чужие ссылки'
+        )
+        secure = client.get(url, secure=True).json()
+        assert secure['next'].startswith('https://'), (
+            'Проверьте, что схема запроса входит в ключ кэша'
+        )
@@ -0,0 +1,76 @@
+import pytest
+
+from reviews.models import Title
+
+
+def search(client, query):
+    response = client.get('/api/v1/titles/', {'search': query})
+    assert response.status_code == 200
+    return [title['name'] for title in response.json()['results']]
+
+
+class Test16TitleSearch:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_search(self, client):
+        Title.objects.create(
+            name='Побег из Шоушенка', year=1994,
+            description='Бухгалтер попадает в тюрьму'
+        )
+        Title.objects.create(
+            name='Крестный отец', year=1972,
+            description='Побег от прошлого невозможен'
+        )
+        Title.objects.bulk_create([
+            Title(name='Звёздные войны', year=1977, description='Космос')
+        ])
+
+        assert search(client, 'побег') == [
+            'Побег из Шоушенка', 'Крестный отец'
+        ], (
+            'Проверьте, что поиск `/api/v1/titles/?search=` не зависит '
+            'от регистра, ищет по описанию и упорядочен по релевантности'
+        )
+        assert search(client, 'шоу') == ['Побег из Шоушенка'], (
+            'Проверьте, что поиск находит слова по префиксу'
+        )
+        assert search(client, 'побег тюрьм') == ['Побег из Шоушенка'], (
+            'Проверьте, что поиск по нескольким словам требует всех слов'
+        )
+        assert search(client, 'ЗВЁЗДНЫЕ') == ['Звёздные войны']
+        assert search(client, '"*()') == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_search_index_sync(self, client):
+        title = Title.objects.create(name='Матрица', year=1999)
+        assert search(client, 'матрица') == ['Матрица']
+        title.name = 'Начало'
+        title.save()
+        assert search(client, 'матрица') == []
+        assert search(client, 'начало') == ['Начало']
+        title.delete()
+        assert search(client, 'начало') == []
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('compiled', (True, False))
+    def test_03_many_titles(self, client, monkeypatch, compiled):
+        if not compiled:
+            monkeypatch.setattr('api.compiled.get_compiled', lambda _: None)
+        Title.objects.bulk_create(
+            [Title(name=f'Фильм {number}', year=2000,
+                   description='Поворот сюжета') for number in range(12)]
+            + [Title(name=f'Поворот {number}', year=2000) for number in range(3)]
+            + [Title(name=f'Другое {number}', year=2000) for number in range(5)]
+        )
+        data = client.get('/api/v1/titles/', {'search': 'поворот'}).json()
+        assert data['count'] == 15, (
+            'Проверьте число найденных произведений в `count`'
+        )
+        names = [title['name'] for title in data['results']]
+        while data['next']:
+            data = client.get(data['next']).json()
+            names.extend(title['name'] for title in data['results'])
+        assert names == (
+            [f'Поворот {number}' for number in range(3)]
+            + [f'Фильм {number}' for number in range(12)]
+        ), 'Проверьте сортировку по релевантности на нескольких страницах'
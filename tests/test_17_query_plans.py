@@ -0,0 +1,92 @@
+import re
+from urllib.parse import quote
+
+import pytest
+from django.db import IntegrityError, connection
+
+from reviews.models import Genre, GenreTitle, Title
+from .common import auth_client, create_comments
+
+# Просмотр FTS5 по MATCH (индекс вида `0:M2`) — поиск по индексу
+FULL_SCAN = re.compile(
+    r'\bSCAN (?:TABLE )?(\w+)\b'
+    r'(?! USING (?:COVERING )?INDEX| VIRTUAL TABLE INDEX \d+:M)'
+)
+TEMP_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+# Списки отзывов и комментариев должны идти по индексу без сортировки
+INDEX_ORDERED = ('FROM "reviews_review"', 'FROM "reviews_comment"')
+
+
+def query_plan(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def check_plans(client, url, method='get', data=None):
+    executed = []
+
+    def record(execute, sql, params, many, context):
+        executed.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(record):
+        response = getattr(client, method)(url, data=data)
+    assert response.status_code < 400, (url, response.status_code)
+    problems = []
+    for sql, params in executed:
+        if not sql.lstrip().upper().startswith('SELECT') or ' WHERE ' not in sql:
+            continue
+        if 'sqlite_master' in sql:
+            # Однократная проверка схемы: есть ли таблица поиска
+            continue
+        ordered = any(table in sql for table in INDEX_ORDERED)
+        for line in query_plan(sql, params):
+            if FULL_SCAN.search(line) or ordered and TEMP_SORT in line:
+                problems.append(f'{line}: {sql}')
+    assert not problems, (
+        f'Проверьте индексы: запрос `{url}` выполняет полный просмотр '
+        'таблицы или сортировку во временном дереве:\n' + '\n'.join(problems)
+    )
+
+
+class Test17QueryPlans:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_endpoint_query_plans(self, client, admin_client, admin):
+        if connection.vendor != 'sqlite':
+            pytest.skip('EXPLAIN QUERY PLAN есть только в SQLite')
+        comments, reviews, titles, user, _ = create_comments(admin_client, admin)
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        Title.objects.bulk_create(
+            Title(name=f'Поворот {number}', year=2000) for number in range(50)
+        )
+        for url in (
+            f'/api/v1/titles/{title_id}/',
+            '/api/v1/titles/?year=2000',
+            '/api/v1/titles/?category=films',
+            '/api/v1/titles/?genre=horror',
+            f'/api/v1/titles/?search={quote("поворот")}',
+            f'/api/v1/titles/?search={quote("поворот")}&cursor=',
+            f'/api/v1/titles/{title_id}/reviews/',
+            f'/api/v1/titles/{title_id}/reviews/?cursor=',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+            f'{comments[0]["id"]}/',
+            '/api/v1/users/me/',
+            f'/api/v1/users/{user.username}/',
+        ):
+            check_plans(admin_client, url)
+        check_plans(
+            auth_client(user), f'/api/v1/titles/{titles[1]["id"]}/reviews/',
+            method='post', data={'text': 'Текст', 'score': 5}
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_genre_title_unique(self):
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        title = Title.objects.create(name='Проект', year=2020)
+        GenreTitle.objects.create(genre=genre, title=title)
+        with pytest.raises(IntegrityError):
+            GenreTitle.objects.create(genre=genre, title=title)
@@ -0,0 +1,48 @@
+import pytest
+
+from .common import create_comments
+
+
+class Test18NestedQueries:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_nested_queries(self, client, admin_client, admin,
+                               django_assert_num_queries):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+        comments_url = f'{reviews_url}{review_id}/comments/'
+
+        for url, queries in (
+            (reviews_url, 2),
+            (f'{reviews_url}{review_id}/', 1),
+            (comments_url, 2),
+            (f'{comments_url}{comments[0]["id"]}/', 1),
+        ):
+            with django_assert_num_queries(queries):
+                response = client.get(url)
+            assert response.status_code == 200, url
+
+        other_title = titles[1]['id']
+        for url in (
+            f'/api/v1/titles/{other_title}/reviews/{review_id}/',
+            f'/api/v1/titles/{other_title}/reviews/{review_id}/comments/',
+            f'/api/v1/titles/{other_title}/reviews/{review_id}/comments/'
+            f'{comments[0]["id"]}/',
+            '/api/v1/titles/0/reviews/',
+        ):
+            assert client.get(url).status_code == 404, (
+                f'Проверьте, что `{url}` с чужим родителем возвращает 404'
+            )
+        assert client.get(f'/api/v1/titles/{other_title}/reviews/').json()[
+            'results'
+        ] == []
+
+        response = admin_client.post(
+            f'/api/v1/titles/{other_title}/reviews/{review_id}/comments/',
+            data={'text': 'Комментарий'}
+        )
+        assert response.status_code == 404, (
+            'Проверьте, что нельзя оставить комментарий к отзыву '
+            'через чужое произведение'
+        )
@@ -0,0 +1,144 @@
+import json
+
+import pytest
+
+from reviews.models import Title
+from .common import create_categories, create_genre
+
+
+def send(client, method, url, data):
+    return getattr(client, method)(
+        url, data=json.dumps(data), content_type='application/json'
+    )
+
+
+class Test19BulkWrite:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_bulk_categories_and_genres(self, client, admin_client):
+        url = '/api/v1/categories/bulk/'
+        data = [{'name': f'Категория {number}', 'slug': f'cat-{number}'}
+                for number in range(50)]
+        data += [
+            {'name': 'Дубль', 'slug': 'cat-0'},
+            {'name': 'Без слага'},
+        ]
+        response = send(client, 'post', url, data)
+        assert response.status_code == 401, (
+            'Проверьте, что массовое создание доступно только администратору'
+        )
+        response = send(admin_client, 'post', url, data)
+        assert response.status_code == 200
+        results = response.json()
+        assert len(results) == len(data), (
+            'Проверьте, что результат возвращается для каждого элемента'
+        )
+        assert [result['status'] for result in results[:50]] == [201] * 50
+        assert results[50]['status'] == 400 and 'slug' in results[50]['errors']
+        assert results[51]['status'] == 400 and 'slug' in results[51]['errors']
+        assert client.get('/api/v1/categories/').json()['count'] == 50
+
+        response = send(admin_client, 'post', url, [
+            {'name': 'Занятый', 'slug': 'cat-1'},
+            {'name': 'Новый', 'slug': 'cat-new'},
+        ])
+        statuses = [result['status'] for result in response.json()]
+        assert statuses == [400, 201], (
+            'Проверьте, что уже существующий slug возвращает ошибку элемента, '
+            'а остальные элементы сохраняются'
+        )
+
+        response = send(admin_client, 'patch', url, [
+            {'slug': 'cat-2', 'name': 'Переименована'},
+            {'slug': 'missing', 'name': 'Нет такой'},
+        ])
+        assert [result['status'] for result in response.json()] == [200, 404]
+
+        response = send(
+            admin_client, 'delete', url, ['cat-3', 'cat-4', 'missing']
+        )
+        assert [result['status'] for result in response.json()] == [
+            204, 204, 404
+        ]
+        response = client.get('/api/v1/categories/?search=Переименована')
+        assert response.json()['count'] == 1, (
+            'Проверьте, что кэш списка сбрасывается после массовой операции'
+        )
+
+        response = send(
+            admin_client, 'post', '/api/v1/genres/bulk/',
+            [{'name': 'Жанр', 'slug': 'genre'}]
+        )
+        assert response.json() == [{'status': 201, 'slug': 'genre'}]
+        response = send(admin_client, 'post', url, {'name': 'x'})
+        assert response.status_code == 400, (
+            'Проверьте, что массовый эндпоинт принимает только список'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_bulk_titles(self, client, admin_client,
+                            django_assert_max_num_queries):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        url = '/api/v1/titles/bulk/'
+        data = [
+            {
+                'name': f'Произведение {number}',
+                'year': 2000 + number % 20,
+                'category': categories[number % 2]['slug'],
+                'genre': [genres[number % 3]['slug'], genres[0]['slug']],
+            }
+            for number in range(100)
+        ]
+        data.append({
+            'name': 'Ошибка', 'year': 2000,
+            'category': 'missing', 'genre': [genres[0]['slug']],
+        })
+        data.append({
+            'name': 'Будущее', 'year': 3000,
+            'category': categories[0]['slug'], 'genre': [],
+        })
+        with django_assert_max_num_queries(10):
+            response = send(admin_client, 'post', url, data)
+        assert response.status_code == 200
+        results = response.json()
+        assert [result['status'] for result in results[:100]] == [201] * 100
+        assert 'category' in results[100]['errors']
+        assert 'year' in results[101]['errors']
+        names = dict(Title.objects.values_list('id', 'name'))
+        assert [names[result['id']] for result in results[:100]] == [
+            f'Произведение {number}' for number in range(100)
+        ], 'Проверьте, что в ответе id созданных произведений по порядку'
+
+        title_id = results[1]['id']
+        title = client.get(f'/api/v1/titles/{title_id}/').json()
+        assert title['name'] == 'Произведение 1'
+        assert title['category']['slug'] == categories[1]['slug']
+        assert sorted(genre['slug'] for genre in title['genre']) == sorted(
+            [genres[1]['slug'], genres[0]['slug']]
+        )
+
+        ids = [result['id'] for result in results[:100]]
+        with django_assert_max_num_queries(10):
+            response = send(admin_client, 'patch', url, [
+                {'id': title_id, 'name': 'Новое имя',
+                 'genre': [genres[2]['slug']]},
+                {'id': ids[2], 'category': categories[0]['slug']},
+                {'id': 0, 'name': 'Нет такого'},
+                {'id': 'abc'},
+            ])
+        assert [result['status'] for result in response.json()] == [
+            200, 200, 404, 400
+        ]
+        title = client.get(f'/api/v1/titles/{title_id}/').json()
+        assert title['name'] == 'Новое имя', (
+            'Проверьте, что кэш произведения сбрасывается после массовой '
+            'операции'
+        )
+        assert [genre['slug'] for genre in title['genre']] == [
+            genres[2]['slug']
+        ]
+
+        response = send(admin_client, 'delete', url, ids[:50])
+        assert {result['status'] for result in response.json()} == {204}
+        assert client.get('/api/v1/titles/').json()['count'] == 50
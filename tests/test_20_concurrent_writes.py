@@ -0,0 +1,110 @@
+import threading
+from functools import partial
+
+import pytest
+from django.core.management import call_command
+from django.db import OperationalError, connections, transaction
+from django.db.models import Sum
+
+from reviews.models import Review, Title
+from users.models import User
+
+ALIAS = 'concurrent_writes'
+WRITERS = 8
+READERS = 2
+TITLES = 15
+
+
+@pytest.fixture
+def file_database(tmp_path):
+    connections.databases[ALIAS] = {
+        **connections['default'].settings_dict,
+        'NAME': str(tmp_path / 'concurrent.sqlite3'),
+    }
+    call_command('migrate', database=ALIAS, run_syncdb=True, verbosity=0)
+    yield ALIAS
+    connections[ALIAS].close()
+    del connections[ALIAS]
+    del connections.databases[ALIAS]
+
+
+def start_thread(target, errors):
+    def run():
+        try:
+            target()
+        except OperationalError as error:
+            errors.append(error)
+        finally:
+            connections[ALIAS].close()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+class Test20ConcurrentWrites:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_parallel_review_writes(self, file_database):
+        User.objects.using(ALIAS).bulk_create(
+            User(username=f'writer{number}', email=f'writer{number}@x.fake')
+            for number in range(WRITERS)
+        )
+        Title.objects.using(ALIAS).bulk_create(
+            Title(name=f'Произведение {number}', year=2000)
+            for number in range(TITLES)
+        )
+        title_ids = list(
+            Title.objects.using(ALIAS).values_list('id', flat=True)
+        )
+        user_ids = list(User.objects.using(ALIAS).values_list('id', flat=True))
+        finished = threading.Event()
+
+        def write_reviews(user_id):
+            for number, title_id in enumerate(title_ids):
+                # Как в ReviewViewSet: проверка дубля и отзыв в одной
+                # транзакции, рейтинг правит сигнал post_save
+                with transaction.atomic(using=ALIAS):
+                    if Review.objects.using(ALIAS).filter(
+                        author_id=user_id, title_id=title_id
+                    ).exists():
+                        continue
+                    Review.objects.using(ALIAS).create(
+                        author_id=user_id,
+                        title_id=title_id,
+                        text='Отзыв',
+                        score=number % 10 + 1
+                    )
+
+        def read_titles():
+            while not finished.is_set():
+                list(Title.objects.using(ALIAS).aggregate(
+                    Sum('rating_count')
+                ).values())
+
+        errors = []
+        writers = [
+            start_thread(partial(write_reviews, user_id), errors)
+            for user_id in user_ids
+        ]
+        readers = [start_thread(read_titles, errors) for _ in range(READERS)]
+        for thread in writers:
+            thread.join()
+        finished.set()
+        for thread in readers:
+            thread.join()
+
+        assert not errors, (
+            'Проверьте, что параллельная запись отзывов в SQLite не падает '
+            f'с ошибкой блокировки: {errors}'
+        )
+        assert Review.objects.using(ALIAS).count() == WRITERS * TITLES
+        for title in Title.objects.using(ALIAS).with_actual_rating():
+            assert title.rating_count == title.actual_rating_count == WRITERS
+            assert title.rating_sum == title.actual_rating_sum
+
+        with connections[ALIAS].cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            assert cursor.fetchone()[0] == 'wal', (
+                'Проверьте, что SQLite работает в режиме WAL'
+            )
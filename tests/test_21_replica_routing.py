@@ -0,0 +1,68 @@
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+
+from reviews.models import Title
+
+REPLICA = 'stale_replica'
+
+
+@pytest.fixture
+def replica(tmp_path, settings):
+    # Реплика, до которой не доходят изменения: видно, откуда прочитаны данные
+    connections.databases[REPLICA] = {
+        **connections['default'].settings_dict,
+        'NAME': str(tmp_path / 'replica.sqlite3'),
+    }
+    call_command('migrate', database=REPLICA, run_syncdb=True, verbosity=0)
+    settings.DATABASE_REPLICAS = [REPLICA]
+    yield REPLICA
+    connections[REPLICA].close()
+    del connections[REPLICA]
+    del connections.databases[REPLICA]
+
+
+class Test21ReplicaRouting:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_reads_go_to_replica(self, client, admin_client, user_client,
+                                    replica):
+        title = Title.objects.create(name='Произведение', year=2000)
+        Title.objects.using(replica).create(
+            id=title.id, name='Произведение', year=2000
+        )
+        url = f'/api/v1/titles/{title.id}/reviews/'
+
+        response = admin_client.post(url, data={'text': 'Отзыв', 'score': 7})
+        assert response.status_code == 201
+        assert admin_client.get(url).json()['count'] == 1, (
+            'Проверьте, что после записи пользователь читает из основной базы'
+        )
+        assert client.get(url).json()['count'] == 0, (
+            'Проверьте, что безопасные запросы к API читают с реплики'
+        )
+        assert user_client.get(url).json()['count'] == 0, (
+            'Проверьте, что закрепление за основной базой действует только '
+            'для записавшего пользователя'
+        )
+
+        response = admin_client.post(url, data={'text': 'Дубль', 'score': 1})
+        assert response.status_code == 400, (
+            'Проверьте, что проверка повторного отзыва читает основную базу'
+        )
+
+        cache.clear()
+        assert admin_client.get(url).json()['count'] == 0, (
+            'Проверьте, что закрепление за основной базой ограничено по времени'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_fresh_cache_reads_primary(self, client, settings, replica):
+        Title.objects.create(name='Произведение', year=2000)
+        assert client.get('/api/v1/titles/').json()['count'] == 1, (
+            'Проверьте, что кэш сразу после изменения каталога заполняется '
+            'из основной базы'
+        )
+        settings.DATABASE_REPLICA_STICKY_SECONDS = 0
+        assert client.get('/api/v1/titles/?year=2000').json()['count'] == 0
@@ -0,0 +1,59 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from reviews.models import Title
+from .common import auth_client, create_reviews
+
+
+def histogram(**counts):
+    return {str(score): counts.get(f's{score}', 0) for score in range(1, 11)}
+
+
+class Test22TitleStats:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_stats_in_title_representation(self, client, admin_client,
+                                              admin,
+                                              django_assert_num_queries):
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+
+        data = client.get(url).json()
+        assert 'review_count' not in data and 'scores' not in data, (
+            'Проверьте, что статистика отзывов выводится только по запросу'
+        )
+        with django_assert_num_queries(2):
+            data = client.get(f'{url}?stats=true').json()
+        assert data['review_count'] == 3
+        assert data['scores'] == histogram(s3=1, s4=1, s5=1), (
+            'Проверьте, что `scores` содержит число отзывов с каждой оценкой'
+        )
+        results = client.get('/api/v1/titles/?stats=1').json()['results']
+        assert {title['id']: title['review_count'] for title in results} == {
+            titles[0]['id']: 3, titles[1]['id']: 0
+        }
+
+        auth_client(user).patch(
+            f'{url}reviews/{reviews[1]["id"]}/', data={'score': 9}
+        )
+        admin_client.delete(f'{url}reviews/{reviews[0]["id"]}/')
+        data = client.get(f'{url}?stats=true').json()
+        assert data['review_count'] == 2
+        assert data['scores'] == histogram(s4=1, s9=1), (
+            'Проверьте, что гистограмма оценок обновляется при изменении и '
+            'удалении отзывов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_rebuild_scores(self, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        Title.objects.filter(pk=titles[0]['id']).update(score_5=0, score_1=7)
+        with pytest.raises(CommandError):
+            call_command('rebuildrating', '--check')
+        call_command('rebuildrating')
+        call_command('rebuildrating', '--check')
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert title.scores == {
+            score: int(score in (3, 4, 5)) for score in range(1, 11)
+        }, 'Проверьте, что `rebuildrating` пересчитывает гистограмму оценок'
@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+
+from .common import create_comments
+
+
+def read(response):
+    assert response.streaming, (
+        'Проверьте, что выгрузка отдаётся через `StreamingHttpResponse`'
+    )
+    return b''.join(response.streaming_content).decode()
+
+
+class Test23Export:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_export_endpoints(self, client, user_client, admin_client,
+                                 admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = '/api/v1/export/'
+        assert client.get(f'{url}titles.ndjson').status_code == 401
+        assert user_client.get(f'{url}titles.ndjson').status_code == 403, (
+            'Проверьте, что выгрузка доступна только администратору'
+        )
+
+        response = admin_client.get(f'{url}titles.ndjson')
+        assert response['Content-Type'] == 'application/x-ndjson'
+        rows = [json.loads(line) for line in read(response).splitlines()]
+        assert [row['id'] for row in rows] == [
+            title['id'] for title in titles
+        ]
+        assert sorted(rows[0]['genre']) == sorted(titles[0]['genre']), (
+            'Проверьте, что выгрузка произведений содержит slug жанров'
+        )
+        assert rows[0]['category'] == titles[0]['category']
+        assert (rows[0]['review_count'], rows[0]['rating']) == (3, 4)
+        assert rows[1]['genre'] == titles[1]['genre']
+
+        response = admin_client.get(f'{url}reviews.csv')
+        assert response['Content-Type'].startswith('text/csv')
+        rows = list(csv.DictReader(io.StringIO(read(response))))
+        assert [int(row['id']) for row in rows] == [
+            review['id'] for review in reviews
+        ]
+        assert rows[0]['author'] == reviews[0]['author']
+
+        response = admin_client.get(
+            f'{url}reviews.ndjson?since_id={reviews[0]["id"]}'
+        )
+        assert [json.loads(line)['id'] for line in read(response).split(
+            '\n'
+        ) if line] == [review['id'] for review in reviews[1:]], (
+            'Проверьте, что `since_id` выгружает только новые записи'
+        )
+        response = admin_client.get(f'{url}comments.ndjson?since=2100-01-01')
+        assert read(response) == '', (
+            'Проверьте, что `since` выгружает записи новее даты публикации'
+        )
+        response = admin_client.get(f'{url}comments.ndjson?since=2000-01-01')
+        assert len(read(response).splitlines()) == len(comments)
+
+        assert admin_client.get(
+            f'{url}titles.ndjson?since=2000-01-01'
+        ).status_code == 400
+        assert admin_client.get(
+            f'{url}reviews.ndjson?since=вчера'
+        ).status_code == 400
+        assert admin_client.get(f'{url}users.ndjson').status_code == 404
+        assert admin_client.get(f'{url}titles.xml').status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_export_command(self, admin_client, admin):
+        comments, *_ = create_comments(admin_client, admin)
+        output = io.StringIO()
+        call_command('export', 'comments', '--format', 'csv', stdout=output)
+        rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+        assert [int(row['id']) for row in rows] == [
+            comment['id'] for comment in comments
+        ], 'Проверьте, что команда `export` выгружает комментарии в CSV'
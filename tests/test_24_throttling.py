@@ -0,0 +1,123 @@
+import pytest
+from django.core.cache import cache
+
+from api.throttling import LocalBucketStore
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+TOKEN_URL = '/api/v1/auth/token/'
+
+
+@pytest.fixture
+def rates(settings):
+    def set_rates(**rates):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': rates,
+        }
+    return set_rates
+
+
+class Test24Throttling:
+
+    def test_01_token_bucket(self):
+        store = LocalBucketStore()
+        # 3 запроса в минуту: ведро на 3 запроса, +1 каждые 20 секунд
+        assert [store.take('key', 20, 60, 1000) for _ in range(3)] == [0] * 3
+        assert store.take('key', 20, 60, 1000) == 20
+        assert store.take('other', 20, 60, 1000) == 0
+        assert store.take('key', 20, 60, 1010) == 10
+        assert store.take('key', 20, 60, 1020) == 0
+        assert store.take('key', 20, 60, 1020) == 20
+        assert store.take('key', 20, 60, 2000) == 0, (
+            'Проверьте, что ведро пополняется со временем'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('store', ['local', 'cache'])
+    def test_02_signup_throttled_by_ip(self, client, settings, rates,
+                                       django_assert_num_queries, store):
+        settings.API_THROTTLE_STORE = store
+        rates(signup_ip='3/min')
+        for number in range(3):
+            response = client.post(SIGNUP_URL, data={
+                'username': f'user{number}',
+                'email': f'user{number}@yamdb.fake',
+            })
+            assert response.status_code == 200
+        with django_assert_num_queries(0):
+            response = client.post(SIGNUP_URL, data={
+                'username': 'user4', 'email': 'user4@yamdb.fake'
+            })
+        assert response.status_code == 429, (
+            'Проверьте, что превышение лимита регистраций с одного IP '
+            'возвращает 429 без запросов к базе'
+        )
+        assert 0 < int(response['Retry-After']) <= 20
+        response = client.post(
+            SIGNUP_URL,
+            data={'username': 'user5', 'email': 'user5@yamdb.fake'},
+            REMOTE_ADDR='10.0.0.2'
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что лимит считается отдельно для каждого IP'
+        )
+        if store == 'cache':
+            assert cache.get('throttle:signup_ip:127.0.0.1') is not None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_token_throttled_by_username(self, client, admin, rates):
+        rates(token_username='2/min')
+        data = {'username': admin.username, 'confirmation_code': 'wrong'}
+        for number in range(2):
+            response = client.post(
+                TOKEN_URL, data=data, REMOTE_ADDR=f'10.0.0.{number}'
+            )
+            assert response.status_code == 400
+        response = client.post(
+            TOKEN_URL,
+            data={**data, 'username': admin.username.upper()},
+            REMOTE_ADDR='10.0.0.9'
+        )
+        assert response.status_code == 429, (
+            'Проверьте, что подбор кода для одного пользователя с разных IP '
+            'ограничивается'
+        )
+        assert 'Retry-After' in response
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_write_throttle(self, admin_client, client, rates):
+        rates(write='2/min')
+        for number in range(2):
+            response = admin_client.post(
+                '/api/v1/categories/',
+                data={'name': f'Категория {number}', 'slug': f'cat-{number}'}
+            )
+            assert response.status_code == 201
+        response = admin_client.post(
+            '/api/v1/categories/', data={'name': 'Лишняя', 'slug': 'extra'}
+        )
+        assert response.status_code == 429, (
+            'Проверьте, что включённый лимит `write` ограничивает запись'
+        )
+        assert client.get('/api/v1/categories/').status_code == 200, (
+            'Проверьте, что лимит `write` не действует на чтение'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_forwarded_for_ignored(self, client, rates):
+        rates(signup_ip='2/min')
+        statuses = [
+            client.post(
+                SIGNUP_URL,
+                data={
+                    'username': f'user{number}',
+                    'email': f'user{number}@yamdb.fake',
+                },
+                HTTP_X_FORWARDED_FOR=f'203.0.113.{number}'
+            ).status_code
+            for number in range(5)
+        ]
+        assert statuses == [200, 200, 429, 429, 429], (
+            'Проверьте, что подменённый `X-Forwarded-For` не сбрасывает '
+            'лимит регистраций с одного IP'
+        )
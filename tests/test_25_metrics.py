@@ -0,0 +1,90 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.serializers import BaseSerializer
+
+from .common import create_titles
+
+METRICS_URL = '/api/v1/metrics/'
+
+
+def sample(text, name, view):
+    match = re.search(
+        rf'^{name}{{view="{re.escape(view)}"}} (\S+)$', text, re.MULTILINE
+    )
+    assert match, f'Проверьте, что в метриках есть `{name}` для `{view}`'
+    return float(match.group(1))
+
+
+class Test25Metrics:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_server_timing(self, client, admin_client, settings):
+        create_titles(admin_client)
+        assert 'Server-Timing' not in client.get('/api/v1/titles/')
+        settings.API_SERVER_TIMING = True
+        response = client.get('/api/v1/titles/?stats=1')
+        header = response['Server-Timing']
+        assert re.fullmatch(
+            r'db;dur=[\d.]+;desc="\d+ queries", serializer;dur=[\d.]+, '
+            r'total;dur=[\d.]+',
+            header
+        ), 'Проверьте формат заголовка `Server-Timing`'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_metrics_endpoint(self, client, user_client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        assert client.get(METRICS_URL).status_code == 401
+        assert user_client.get(METRICS_URL).status_code == 403, (
+            'Проверьте, что метрики доступны только администратору'
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        retrieve_queries = len(queries)
+        retrieve_size = len(response.content)
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+
+        response = admin_client.get(METRICS_URL)
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        assert (
+            'api_requests_total{view="TitleViewSet.list",status="200"} 2'
+            in text
+        ), 'Проверьте, что запросы учитываются по представлению и действию'
+        assert sample(
+            text, 'api_request_duration_seconds_count', 'TitleViewSet.list'
+        ) == 2
+        assert sample(
+            text, 'api_db_queries_sum', 'TitleViewSet.retrieve'
+        ) == retrieve_queries, (
+            'Проверьте, что учитывается число запросов к базе'
+        )
+        assert sample(
+            text, 'api_serializer_duration_seconds_sum', 'TitleViewSet.list'
+        ) > 0
+        assert sample(
+            text, 'api_response_size_bytes_sum', 'TitleViewSet.retrieve'
+        ) == retrieve_size
+        assert 'view="CategoryViewSet.create"' in text
+        assert (
+            'api_db_queries_bucket{view="TitleViewSet.retrieve",le="+Inf"} 1'
+            in text
+        )
+
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_serializer_time_without_patching(self, client, admin_client):
+        assert BaseSerializer.data.fget.__module__ == (
+            'rest_framework.serializers'
+        ), 'Проверьте, что метрики не подменяют `BaseSerializer.data`'
+        titles, _, _ = create_titles(admin_client)
+        client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        text = admin_client.get(METRICS_URL).content.decode()
+        for view in ('TitleViewSet.retrieve', 'CategoryViewSet.create'):
+            assert sample(
+                text, 'api_serializer_duration_seconds_sum', view
+            ) > 0, f'Проверьте, что время сериализации `{view}` учитывается'
@@ -0,0 +1,74 @@
+import logging
+
+import pytest
+from django.db import connections
+
+from api.metrics import track_queries
+from api.querylog import DuplicateQueriesError, QueryInspector, normalize_sql
+from api.views import ReviewViewSet
+from reviews.models import Review
+from .common import create_reviews
+
+
+def reviews_without_authors(self):
+    return Review.objects.filter(title_id=self.kwargs.get('title_id'))
+
+
+class Test26QueryInspector:
+
+    def test_01_normalize_sql(self):
+        assert normalize_sql(
+            'SELECT "a"."score_1" FROM "a" WHERE "a"."id" IN (%s, %s, %s) '
+            "AND  \"a\".\"name\" = 'x''y' LIMIT 21"
+        ) == (
+            'SELECT "a"."score_1" FROM "a" WHERE "a"."id" IN (...) '
+            'AND "a"."name" = ? LIMIT ?'
+        ), 'Проверьте, что значения в запросе заменяются заглушками'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_duplicates_in_code(self, admin_client, admin):
+        create_reviews(admin_client, admin)
+        inspector = QueryInspector(threshold=3)
+        with track_queries(connections, inspector):
+            authors = [
+                review.author.username for review in Review.objects.all()
+            ]
+        assert len(authors) == 3
+        duplicates = inspector.duplicates()
+        assert len(duplicates) == 1
+        assert duplicates[0].count == 3
+        assert duplicates[0].sql.startswith('SELECT')
+        assert duplicates[0].origin.startswith(
+            '../tests/test_26_query_inspector.py:'
+        ), 'Проверьте, что указано место в коде, откуда идут запросы'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_duplicates_in_request(self, client, admin_client, admin,
+                                      settings, monkeypatch, caplog):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        assert client.get(url).status_code == 200
+        monkeypatch.setattr(
+            ReviewViewSet, 'get_queryset', reviews_without_authors
+        )
+        # Обычный путь сериализатора, где автор читается у каждого отзыва
+        monkeypatch.setattr('api.compiled.get_compiled', lambda _: None)
+        with pytest.raises(DuplicateQueriesError, match='ReviewViewSet.list'):
+            client.get(url)
+
+        settings.API_QUERY_INSPECTOR = 'log'
+        with caplog.at_level(logging.WARNING, logger='api.queries'):
+            assert client.get(url).status_code == 200
+        assert 'Вероятный N+1 в ReviewViewSet.list' in caplog.text
+        assert '3 раз' in caplog.text and 'users_user' in caplog.text
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_slow_queries(self, client, settings, caplog):
+        settings.API_SLOW_QUERY_MS = 0
+        with caplog.at_level(logging.WARNING, logger='api.queries'):
+            client.get('/api/v1/categories/')
+        assert 'Медленный запрос' in caplog.text, (
+            'Проверьте, что запросы дольше API_SLOW_QUERY_MS пишутся в лог'
+        )
+        assert 'CategoryViewSet.list' in caplog.text
+        assert 'reviews_category' in caplog.text
@@ -0,0 +1,118 @@
+import asyncio
+import json
+
+import pytest
+
+from api.benchmark import seed
+from api.loadtest import run_loadtest
+from api_yamdb.handlers.asgi import ASGIHandler
+from .common import create_comments
+
+
+def asgi_request(app, method, path, query='', headers=(), body=b''):
+    scope = {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': method,
+        'path': path,
+        'query_string': query.encode(),
+        'headers': [
+            (name.encode(), value.encode()) for name, value in headers
+        ],
+        'client': ('10.0.0.1', 5000),
+        'server': ('testserver', 80),
+    }
+    # Тело приходит двумя сообщениями, как при медленной передаче
+    messages = [
+        {'type': 'http.request', 'body': body[:3], 'more_body': True},
+        {'type': 'http.request', 'body': body[3:]},
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    assert sent[0]['type'] == 'http.response.start'
+    return (
+        sent[0]['status'],
+        dict(sent[0]['headers']),
+        b''.join(message.get('body', b'') for message in sent[1:]),
+    )
+
+
+class Test27ASGI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_read_endpoints(self, client, admin_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        app = ASGIHandler(threads=2)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        review_url = f'{title_url}reviews/{reviews[0]["id"]}/'
+        for path, query in (
+            ('/api/v1/categories/', ''),
+            ('/api/v1/genres/', 'search=a'),
+            ('/api/v1/titles/', 'stats=1'),
+            (title_url, ''),
+            (f'{title_url}reviews/', ''),
+            (review_url, ''),
+            (f'{review_url}comments/', ''),
+            (f'{review_url}comments/{comments[0]["id"]}/', ''),
+        ):
+            status, headers, body = asgi_request(app, 'GET', path, query)
+            response = client.get(f'{path}?{query}')
+            assert status == 200
+            assert headers[b'Content-Type'] == b'application/json'
+            assert json.loads(body) == response.json(), (
+                f'Проверьте, что ASGI отдаёт по `{path}` тот же ответ, '
+                'что и WSGI'
+            )
+        assert asgi_request(app, 'GET', '/api/v1/titles/0/')[0] == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_write_and_stream(self, admin_client, admin):
+        comments, *_ = create_comments(admin_client, admin)
+        app = ASGIHandler(threads=2)
+        authorization = admin_client._credentials['HTTP_AUTHORIZATION']
+        status, _, body = asgi_request(
+            app, 'POST', '/api/v1/categories/',
+            headers=(
+                ('Authorization', authorization),
+                ('Content-Type', 'application/json'),
+            ),
+            body=json.dumps({'name': 'Опера', 'slug': 'opera'}).encode()
+        )
+        assert status == 201, (
+            'Проверьте, что тело запроса из нескольких сообщений ASGI '
+            'читается целиком'
+        )
+        assert json.loads(body) == {'name': 'Опера', 'slug': 'opera'}
+        status, headers, body = asgi_request(
+            app, 'GET', '/api/v1/export/comments.ndjson',
+            headers=(('Authorization', authorization),)
+        )
+        assert status == 200
+        assert headers[b'Content-Type'] == b'application/x-ndjson'
+        assert len(body.decode().splitlines()) == len(comments), (
+            'Проверьте, что потоковые ответы отправляются через ASGI'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_loadtest(self):
+        seed({
+            'users': 3, 'categories': 2, 'genres': 2, 'titles': 4,
+            'reviews_per_title': 2, 'comments_per_review': 1,
+        })
+        results = run_loadtest(
+            requests=16, concurrency=4, threads=2,
+            slow_clients=2, client_delay=0.05
+        )
+        assert set(results) == {'wsgi', 'asgi'}
+        for mode, result in results.items():
+            assert result['errors'] == 0, (
+                f'Нагрузочный тест {mode} получил ошибки: {result}'
+            )
+            assert result['rps'] > 0
@@ -0,0 +1,77 @@
+import pytest
+from django.core.cache import caches
+
+from api.benchmark import benchmark_serializers, seed
+from api.compiled import get_compiled
+from api.serializers import (CommentSerializer, ReviewSerializer,
+                             TitleSerializerRead, TitleSerializerWrite)
+from .common import create_comments
+
+
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+
+
+class Test28CompiledSerializers:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_same_json(self, client, admin_client, admin, monkeypatch):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Без категории', 'year': 2000, 'genre': []
+        })
+        review_url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        )
+        urls = (
+            '/api/v1/titles/',
+            '/api/v1/titles/?stats=1',
+            '/api/v1/titles/?page=2',
+            '/api/v1/titles/?cursor=',
+            '/api/v1/titles/?search=поворот',
+            f'/api/v1/titles/?genre={titles[0]["genre"][0]}',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/?cursor=',
+            f'{review_url}comments/',
+        )
+        compiled = {url: client.get(url).content for url in urls}
+        assert b'"results":[]' not in b''.join(compiled.values())
+        clear_caches()
+        monkeypatch.setattr('api.compiled.get_compiled', lambda _: None)
+        for url in urls:
+            assert client.get(url).content == compiled[url], (
+                f'Проверьте, что ответ `{url}` совпадает побайтно с обычным '
+                'сериализатором'
+            )
+
+    def test_02_not_compilable(self):
+        assert get_compiled(TitleSerializerWrite()) is None, (
+            'Проверьте, что сериализаторы с полями записи идут обычным путём'
+        )
+        serializer = TitleSerializerRead(context={'with_stats': True})
+        compiled = get_compiled(serializer)
+        assert 'genre' not in compiled.columns
+        assert {'category__slug', 'score_10'} <= set(compiled.columns)
+        assert get_compiled(ReviewSerializer()) is not None
+        assert get_compiled(CommentSerializer()).columns == [
+            'id', 'text', 'author__username', 'pub_date'
+        ]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_benchmark(self):
+        seed({
+            'users': 3, 'categories': 2, 'genres': 3, 'titles': 6,
+            'reviews_per_title': 2, 'comments_per_review': 1,
+        })
+        results = benchmark_serializers(page_sizes=(5, 10), repeat=1)
+        assert set(results) == {
+            f'{name}/{size}'
+            for name in ('titles', 'reviews', 'comments')
+            for size in (5, 10)
+        }
+        for name, result in results.items():
+            assert result['identical'], (
+                f'Быстрый путь `{name}` дал другой JSON'
+            )
+            assert result['compiled_per_s'] > 0
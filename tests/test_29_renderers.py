@@ -0,0 +1,72 @@
+import datetime as dt
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api.benchmark import benchmark_renderers, seed
+from api.renderers import FastJSONRenderer, get_json_backend
+
+DATA = {
+    'id': 1,
+    'name': 'Произведение "в кавычках"\n',
+    'pub_date': timezone.make_aware(
+        dt.datetime(2022, 7, 1, 12, 30, 5, 123456), timezone.utc
+    ),
+    'local_date': dt.datetime(2022, 7, 1, 12, 30),
+    'rating': Decimal('7.50'),
+    'scores': {1: 0, 10: 2},
+    'text': 'строка с разделителем \u2028',
+    'genre': [{'name': 'Драма', 'slug': 'drama'}],
+    'empty': None,
+    'float': 0.1,
+}
+
+
+class Test29Renderers:
+
+    def test_01_same_output(self, settings):
+        expected = JSONRenderer().render(DATA)
+        assert FastJSONRenderer().render(DATA) == expected, (
+            'Проверьте, что быстрый рендерер даёт тот же JSON, включая даты, '
+            'Decimal и U+2028'
+        )
+        assert FastJSONRenderer().render(
+            DATA, 'application/json; indent=4'
+        ) == JSONRenderer().render(DATA, 'application/json; indent=4')
+        settings.API_JSON_BACKEND = 'json'
+        assert get_json_backend() is None
+        assert FastJSONRenderer().render(DATA) == expected
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_parser(self, admin_client, settings):
+        for backend in ('auto', 'json'):
+            settings.API_JSON_BACKEND = backend
+            response = admin_client.post(
+                '/api/v1/categories/',
+                data=f'{{"name": "Кино", "slug": "kino-{backend}"}}',
+                content_type='application/json'
+            )
+            assert response.status_code == 201
+            assert response.json()['name'] == 'Кино'
+            response = admin_client.post(
+                '/api/v1/categories/', data='{"name": ',
+                content_type='application/json'
+            )
+            assert response.status_code == 400
+            assert 'JSON parse error' in response.json()['detail']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_benchmark(self):
+        seed({
+            'users': 3, 'categories': 2, 'genres': 3, 'titles': 6,
+            'reviews_per_title': 2, 'comments_per_review': 0,
+        })
+        results = benchmark_renderers(page_sizes=(5,), repeat=1)
+        assert set(results) == {'titles/5', 'reviews/5'}
+        for name, result in results.items():
+            assert result['renders_per_s']['json'] > 0
+            assert all(result['identical'].values()), (
+                f'Быстрый рендерер дал другой JSON для `{name}`'
+            )
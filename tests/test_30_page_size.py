@@ -0,0 +1,98 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.views import GenreViewSet, TitleViewSet
+from reviews.models import Genre, Title
+
+
+def create_titles(count):
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {number}', year=2000)
+        for number in range(count)
+    )
+    return list(Title.objects.order_by('id').values_list('id', flat=True))
+
+
+class Test30PageSize:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_page_size(self, client, monkeypatch):
+        ids = create_titles(12)
+        for param in ('page_size', 'limit'):
+            data = client.get(f'/api/v1/titles/?{param}=10').json()
+            assert [item['id'] for item in data['results']] == ids[:10], (
+                f'Проверьте, что `{param}` задаёт размер страницы'
+            )
+            assert data['count'] == 12
+
+        data = client.get('/api/v1/titles/?page_size=10&page=2').json()
+        assert [item['id'] for item in data['results']] == ids[10:]
+        data = client.get('/api/v1/titles/?page_size=abc').json()
+        assert len(data['results']) == 5, (
+            'Проверьте, что при неверном `page_size` используется размер '
+            'страницы по умолчанию'
+        )
+
+        monkeypatch.setattr(TitleViewSet, 'max_page_size', 3, raising=False)
+        for url in ('/api/v1/titles/?limit=100',
+                    '/api/v1/titles/?cursor=&page_size=100'):
+            data = client.get(url).json()
+            assert len(data['results']) == 3, (
+                'Проверьте, что размер страницы ограничен `max_page_size` '
+                'представления'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_endpoint_maximum(self, client):
+        Genre.objects.bulk_create(
+            Genre(name=f'Жанр {number}', slug=f'genre-{number}')
+            for number in range(150)
+        )
+        data = client.get('/api/v1/genres/?limit=1000').json()
+        assert len(data['results']) == 150, (
+            'Проверьте, что справочники можно получить одной страницей'
+        )
+        assert GenreViewSet.max_page_size > 100
+        create_titles(150)
+        data = client.get('/api/v1/titles/?limit=1000').json()
+        assert len(data['results']) == 100, (
+            'Проверьте, что размер страницы произведений ограничен '
+            '`API_MAX_PAGE_SIZE`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_without_count(self, client):
+        ids = create_titles(7)
+        url = '/api/v1/titles/?count=false&limit=3'
+        with CaptureQueriesContext(connection) as queries:
+            data = client.get(url).json()
+        assert not any(
+            'COUNT(' in query['sql'].upper() for query in queries
+        ), 'Проверьте, что `count=false` не выполняет COUNT(*)'
+        assert 'count' not in data
+        assert [item['id'] for item in data['results']] == ids[:3]
+        assert data['previous'] is None
+
+        pages = [data]
+        while data['next']:
+            data = client.get(data['next']).json()
+            pages.append(data)
+        assert [
+            item['id'] for page in pages for item in page['results']
+        ] == ids, 'Проверьте ссылки `next` без подсчёта `count`'
+        assert len(pages) == 3
+        previous = client.get(pages[-1]['previous']).json()
+        assert previous['results'] == pages[1]['results'], (
+            'Проверьте ссылку `previous` без подсчёта `count`'
+        )
+        assert '?page=' not in pages[1]['previous'] and (
+            '&page=' not in pages[1]['previous']
+        ), 'Проверьте, что ссылка на первую страницу без номера страницы'
+
+        response = client.get('/api/v1/titles/?count=false&page=9')
+        assert response.status_code == 404, (
+            'Проверьте, что страница за концом списка возвращает 404'
+        )
+        response = client.get('/api/v1/titles/?count=0&page=0')
+        assert response.status_code == 404
@@ -0,0 +1,130 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments
+
+
+def get_with_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+        sql = [query['sql'] for query in queries]
+    assert response.status_code == 200, url
+    return response.json(), sql
+
+
+class Test31SparseFields:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles(self, client, admin_client, admin):
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+        data, sql = get_with_queries(client, '/api/v1/titles/?fields=id,name')
+        assert [set(item) for item in data['results']] == [
+            {'id', 'name'}
+        ] * len(titles), (
+            'Проверьте, что `fields` оставляет в ответе только выбранные поля'
+        )
+        assert not any(
+            'reviews_category' in query or 'reviews_genre' in query
+            or 'description' in query for query in sql
+        ), 'Проверьте, что `fields` убирает из SQL ненужные колонки и связи'
+
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        data, sql = get_with_queries(
+            client, f'{url}?omit=genre,description&expand=scores'
+        )
+        assert list(data) == [
+            'id', 'name', 'year', 'rating', 'category', 'scores'
+        ], 'Проверьте `omit` и `expand` для произведения'
+        assert len(sql) == 1 and 'reviews_category' in sql[0]
+        assert '"description"' not in sql[0]
+
+        data, _ = get_with_queries(client, f'{url}?stats=1&fields=id')
+        assert list(data) == ['id']
+        data, _ = get_with_queries(client, f'{url}?stats=1&omit=scores')
+        assert 'review_count' in data and 'scores' not in data, (
+            'Проверьте, что `stats=1` по-прежнему добавляет статистику'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_comments_users(self, client, admin_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        review_url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        )
+        data, sql = get_with_queries(client, f'{review_url}?fields=id,author')
+        assert data == {'id': reviews[0]['id'], 'author': admin.username}
+        assert '"text"' not in sql[0] and '"password"' not in sql[0], (
+            'Проверьте, что отзыв читается только с нужными колонками'
+        )
+        data, sql = get_with_queries(
+            client, f'/api/v1/titles/{titles[0]["id"]}/reviews/?omit=author'
+        )
+        assert all('author' not in item for item in data['results'])
+        assert not any('users_user' in query for query in sql)
+
+        data, _ = get_with_queries(
+            client, f'{review_url}comments/?fields=text'
+        )
+        assert sorted(data['results'], key=lambda item: item['text']) == [
+            {'text': comment['text']} for comment in comments
+        ], 'Проверьте `fields` для комментариев'
+
+        data, sql = get_with_queries(
+            admin_client, '/api/v1/users/?fields=username,role'
+        )
+        assert all(set(item) == {'username', 'role'}
+                   for item in data['results'])
+        assert '"email"' not in sql[-1], (
+            'Проверьте, что список пользователей читает только нужные колонки'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('compiled', (True, False))
+    def test_03_cursor(self, client, admin_client, admin, monkeypatch,
+                       compiled):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        if not compiled:
+            monkeypatch.setattr('api.compiled.get_compiled', lambda _: None)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        for url, field, expected in (
+            ('/api/v1/titles/', 'name',
+             [title['name'] for title in titles]),
+            (f'{title_url}reviews/', 'text',
+             [review['text'] for review in reviews][::-1]),
+            (f'{title_url}reviews/{reviews[0]["id"]}/comments/', 'text',
+             [comment['text'] for comment in comments][::-1]),
+        ):
+            url = f'{url}?fields={field}&cursor=&limit=1'
+            items = []
+            while url:
+                response = client.get(url)
+                assert response.status_code == 200, (
+                    'Проверьте, что `fields` без колонок курсора не ломает '
+                    'курсорную пагинацию'
+                )
+                data = response.json()
+                assert all(list(item) == [field] for item in data['results'])
+                items.extend(item[field] for item in data['results'])
+                url = data['next']
+            assert items == expected
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_errors_and_writes(self, admin_client):
+        response = admin_client.get('/api/v1/titles/?fields=id,nope')
+        assert response.status_code == 400, (
+            'Проверьте, что неизвестное поле в `fields` возвращает 400'
+        )
+        assert 'fields' in response.json()
+        response = admin_client.get('/api/v1/users/?expand=email')
+        assert response.status_code == 400, (
+            'Проверьте, что `expand` принимает только раскрываемые поля'
+        )
+
+        response = admin_client.post('/api/v1/users/?fields=username', data={
+            'username': 'sparse', 'email': 'sparse@yamdb.fake'
+        })
+        assert response.status_code == 201
+        assert response.json()['email'] == 'sparse@yamdb.fake', (
+            'Проверьте, что `fields` не влияет на запись'
+        )
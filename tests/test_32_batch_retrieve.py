@@ -0,0 +1,85 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.views import TitleViewSet
+from .common import auth_client, create_reviews
+
+
+class Test32BatchRetrieve:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles(self, client, admin_client, admin, monkeypatch):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        first, second = (title['id'] for title in titles)
+        url = f'/api/v1/titles/?ids={second},999,{first},{second}'
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+            query_count = len(queries)
+        assert response.status_code == 200
+        data = response.json()
+        assert [item['id'] for item in data['results']] == [second, first], (
+            'Проверьте, что `ids` возвращает произведения в порядке запроса'
+        )
+        assert data['missing'] == [999], (
+            'Проверьте, что ненайденные `ids` перечислены в `missing`'
+        )
+        assert query_count <= 2, (
+            'Проверьте, что произведения и их жанры читаются одним запросом '
+            'на каждую таблицу'
+        )
+        for item in data['results']:
+            detail = client.get(f'/api/v1/titles/{item["id"]}/').json()
+            assert item == detail, (
+                'Проверьте, что объекты `ids` совпадают с ответом по одному'
+            )
+
+        monkeypatch.setattr('api.batch.get_compiled', lambda _: None)
+        response = client.get(f'{url}&fields=id,genre&stats=1')
+        assert [set(item) for item in response.json()['results']] == [
+            {'id', 'genre'}
+        ] * 2
+
+        assert client.get('/api/v1/titles/?ids=1,abc').status_code == 400
+        monkeypatch.setattr(TitleViewSet, 'max_page_size', 2, raising=False)
+        response = client.get('/api/v1/titles/?ids=1,2,3')
+        assert response.status_code == 400, (
+            'Проверьте, что число `ids` ограничено размером страницы'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews(self, client, admin_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        ids = [review['id'] for review in reviews][::-1]
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data = client.get(f'{url}?ids={",".join(map(str, ids))},12345').json()
+        assert [item['id'] for item in data['results']] == ids
+        assert data['missing'] == [12345]
+
+        data = client.get(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/?ids={ids[0]}'
+        ).json()
+        assert data == {'results': [], 'missing': [ids[0]]}, (
+            'Проверьте, что `ids` ищет отзывы только своего произведения'
+        )
+        response = client.get(f'/api/v1/titles/12345/reviews/?ids={ids[0]}')
+        assert response.status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_users(self, admin_client, admin):
+        _, _, user, moderator = create_reviews(admin_client, admin)
+        response = admin_client.get(
+            f'/api/v1/users/?usernames={moderator.username},nobody,'
+            f'{admin.username}'
+        )
+        data = response.json()
+        assert [item['username'] for item in data['results']] == [
+            moderator.username, admin.username
+        ], 'Проверьте `usernames` для пользователей'
+        assert data['missing'] == ['nobody']
+        response = auth_client(user).get(
+            f'/api/v1/users/?usernames={admin.username}'
+        )
+        assert response.status_code == 403, (
+            'Проверьте, что список пользователей доступен только админу'
+        )